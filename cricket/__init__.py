@@ -1,5 +1,17 @@
-from .functions import *  # noqa
-from .classes import *  # noqa
-from .squads import *  # noqa
-from .match import *  # noqa
-from .inning import *  # noqa
+from importlib import import_module
+
+_modules = ['functions', 'events', 'classes', 'squads', 'match', 'inning', 'tables', 'batch', 'parallel']
+
+
+def __getattr__(name):
+    if name in _modules:
+        return import_module('.' + name, __name__)
+
+    if not name.startswith('_'):
+        for module in _modules:
+            module = import_module('.' + module, __name__)
+            if hasattr(module, name):
+                globals()[name] = value = getattr(module, name)
+                return value
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
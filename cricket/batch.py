@@ -0,0 +1,342 @@
+"""
+This module simulates many independent matches between the same two squads at
+once. The state of every match is held in NumPy arrays and all matches are
+advanced ball-by-ball in lockstep, sampling outcomes from the same stored
+frequencies and weights as `Inning`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from tables import FreqStore, bowling_types
+
+
+def sample(p, rng):
+    """
+    Draw one index from each row of a matrix of outcome weights.
+
+    Parameters
+    ----------
+    p : np.array
+        unnormalised weights, one row per draw.
+    rng : np.random.Generator
+        random number generator.
+
+    Returns
+    -------
+    np.array
+        sampled column indices.
+
+    """
+    cum = p.cumsum(1)
+    u = rng.random(len(p)) * cum[:, -1]
+    return np.minimum((u[:, None] >= cum).sum(1), p.shape[1] - 1)
+
+
+class BatchMatch:
+    def __init__(self, index, teams, pdb, n, seed=None):
+        """
+        Initialise `n` simulations of a match between two squads.
+
+        Parameters
+        ----------
+        index : int
+            match identifier.
+        teams : list
+            names of the two teams.
+        pdb : dict
+            player database.
+        n : int
+            number of simulations.
+        seed : int, optional
+            seed for the random number generator. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.index = index
+        self.teams = teams
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        store = FreqStore.get()
+        self.tables = store.tables
+        self.toss_sampler = store.toss
+
+        self.players = [list(pdb[team].starting) for team in teams]
+        size = max(map(len, self.players))
+        self.batting_style = np.full((2, size), -1)
+        self.bowling_style = np.full((2, size), -1)
+        self.bowling_type = np.zeros((2, size), int)
+        self.attack = []
+
+        for i, (team, players) in enumerate(zip(teams, self.players)):
+            self.batting_style[i, :len(players)] = self.tables.codes('batting', (p.batting_style for p in players))
+            self.bowling_style[i, :len(players)] = self.tables.codes('bowling', (p.bowling_style for p in players))
+            self.bowling_type[i, :len(players)] = [bowling_types.index(p.bowling_style[-1])
+                                                   if isinstance(p.bowling_style, str) else 0 for p in players]
+
+            keeper = next((p for p in reversed(players) if 'keeper' in str(p.role)), None)
+            self.attack.append([players.index(p) for p in pdb[team].bowling_order if p in players and p != keeper])
+
+        self.attack = np.array([attack + [-1] * (size - len(attack)) for attack in self.attack])
+
+    @property
+    def results(self):
+        """
+        Result and inning scores of every simulation.
+
+        Returns
+        -------
+        pd.DataFrame
+            one row per simulation.
+
+        """
+        names = np.array([*self.teams, None, None], object)
+        margin = np.array(['', 'wickets', 'runs', 'innings'])[self.margin]
+        result = ['draw' if w == -1 else 'tie' if w == -2 else
+                  names[w] + ' won by ' + ('an innings and {} runs' if m == 'innings' else '{} ' + m).format(b)
+                  for w, b, m in zip(self.winner, self.by, margin)]
+
+        card = pd.DataFrame({'Result': result, 'Winner': names[self.winner], 'By': self.by, 'Margin': margin},
+                            pd.RangeIndex(self.n, name='Simulation'))
+
+        for i in range(4):
+            played = self.batting_team[:, i] >= 0
+            card['Inn {}'.format(i + 1)] = np.where(played, names[self.batting_team[:, i]], None)
+            card['R{}'.format(i + 1)] = np.where(played, self.scores[:, i, 0], -1)
+            card['W{}'.format(i + 1)] = np.where(played, self.scores[:, i, 1], -1)
+
+        return card
+
+    @property
+    def totals(self):
+        """
+        Number and share of wins for each team, draws and ties.
+
+        Returns
+        -------
+        pd.DataFrame
+            outcome counts and percentages.
+
+        """
+        counts = [np.sum(self.winner == i) for i in (0, 1, -1, -2)]
+        card = pd.DataFrame({'Count': counts}, [*self.teams, 'draw', 'tie']).rename_axis(self.index)
+        card['%'] = (card['Count'] / self.n * 100).round(2)
+
+        return card
+
+    @property
+    def batting(self):
+        """
+        Average runs and balls per match for each batter.
+
+        Returns
+        -------
+        pd.DataFrame
+            batting averages.
+
+        """
+        return self._averages(self.batter_stats, 0, ['R', 'B'])
+
+    @property
+    def bowling(self):
+        """
+        Average balls, runs and wickets per match for each bowler.
+
+        Returns
+        -------
+        pd.DataFrame
+            bowling averages.
+
+        """
+        return self._averages(self.bowler_stats, 1, ['B', 'R', 'W'])
+
+    def _averages(self, stats, bowling, columns):
+        cards = {}
+        for i, (team, players) in enumerate(zip(self.teams, self.players)):
+            innings = self.batting_team == (i ^ bowling)
+            cards[team] = pd.DataFrame((stats * innings[..., None, None]).sum(1).mean(0)[:len(players)],
+                                       [player.name for player in players], columns)
+
+        return pd.concat(cards).rename_axis(['Team', 'Name'])
+
+    def run(self):
+        """
+        Simulate all matches to completion.
+
+        Returns
+        -------
+        None.
+
+        """
+        n, size = self.n, self.attack.shape[1]
+        rows = np.arange(n)
+
+        self.batting_team = np.full((n, 4), -1)
+        self.scores = np.zeros((n, 4, 2), int)
+        self.overs = np.zeros((n, 4), int)
+        self.batter_stats = np.zeros((n, 4, size, 2), np.int32)
+        self.bowler_stats = np.zeros((n, 4, size, 3), np.int32)
+        self.target = np.full(n, np.iinfo(int).max)
+        self.follow_on = np.zeros(n, bool)
+
+        self.inn = np.zeros(n, int)
+        self.clock = np.zeros(n, int)
+        self.legal = np.zeros(n, int)
+        self.crease = np.zeros((n, 2), int)
+        self.striker = np.zeros(n, int)
+        self.next_in = np.zeros(n, int)
+        self.ends = np.zeros((n, 2), int)
+        self.spell = np.zeros((n, size), int)
+        self.live = np.ones(n, bool)
+
+        self.toss = (self.toss_sampler.draws(self.rng, n) == 'field') + self.rng.integers(0, 2, n)
+        self._new_inning(rows)
+
+        while self.live.any():
+            r = np.flatnonzero(self.live)
+            i = self.inn[r]
+            completed = self.overs[r, i] - (self.legal[r] < 6)
+            stumps = self.clock[r] + completed >= 450
+            self.live[r[stumps]] = False
+            r = r[~stumps]
+
+            self._next_over(r[self.legal[r] == 6])
+            self._next_ball(r)
+
+            i = self.inn[r]
+            end = (self.scores[r, i, 1] == 10) | (self.scores[r, i, 0] >= self.target[r])
+            self._next_inning(r[end])
+
+        self._outcome()
+
+    def _new_inning(self, r):
+        i = self.inn[r]
+        self.batting_team[r, i] = (i + self.toss[r] + self.follow_on[r]) % 2
+        self.legal[r] = 6
+        self.crease[r] = [0, 1]
+        self.striker[r] = 0
+        self.next_in[r] = 2
+        self.ends[r] = -1
+        self.spell[r] = 0
+
+    def _next_inning(self, r):
+        i = self.inn[r]
+        self.clock[r] += self.overs[r, i]
+        self.live[r[i == 3]] = False
+        r, i = r[i < 3], i[i < 3] + 1
+        self.inn[r] = i
+
+        lead = self.scores[r, 0, 0] - self.scores[r, 1, 0]
+        decide = (i == 2) & (lead > 200)
+        self.follow_on[r[decide]] = ((lead[decide] > 300) | (self.clock[r[decide]] >= 3 * 90)
+                                     | self.rng.integers(0, 2, decide.sum()).astype(bool))
+
+        chase = i == 3
+        rc = r[chase]
+        self.target[rc] = self.scores[rc, 2, 0] + np.where(self.follow_on[rc], -1, 1) * lead[chase] + 1
+        self.live[rc[self.target[rc] <= 0]] = False
+
+        self._new_inning(r[self.live[r]])
+
+    def _next_over(self, r):
+        i = self.inn[r]
+        team = 1 - self.batting_team[r, i]
+        k = self.overs[r, i]
+        older, newer = self.ends[r].T
+        chosen = older.copy()
+
+        started = k >= 1
+        self.spell[r[started], newer[started]] -= 1
+
+        first = k < 2
+        chosen[first] = self.attack[team[first], k[first]]
+        self.spell[r[first], chosen[first]] = self.rng.integers(5, 8, first.sum())
+
+        change = np.flatnonzero(~first)
+        change = change[self.spell[r[change], older[change]] == 0]
+        attack = self.attack[team[change]]
+        valid = (attack >= 0) & (attack != older[change, None]) & (attack != newer[change, None])
+        pick = np.where(valid, self.rng.random(attack.shape), -1).argmax(1)
+        chosen[change] = np.where(valid.any(1), attack[np.arange(len(change)), pick], older[change])
+        self.spell[r[change], chosen[change]] = self.rng.integers(4, 8, len(change))
+
+        self.ends[r] = np.column_stack([newer, chosen])
+        self.overs[r, i] += 1
+        self.legal[r] = 0
+
+    def _next_ball(self, r):
+        rng, tables = self.rng, self.tables
+        m = len(r)
+        i = self.inn[r]
+        team = self.batting_team[r, i]
+        position = self.crease[r, self.striker[r]]
+        bowler = self.ends[r, 1]
+        bowling_type = self.bowling_type[1 - team, bowler]
+        balls = (6 * (self.overs[r, i] - 1) + np.maximum(0, self.legal[r] - 1))
+
+        p = tables.probs(i, np.minimum(position, 10), (self.batter_stats[r, i, position, 1] - 1) // 20, bowling_type,
+                         (self.bowler_stats[r, i, bowler, 0] - 1) // 30, self.batting_style[team, position],
+                         self.bowling_style[1 - team, bowler], balls // 60)
+        value = sample(p, rng)
+
+        u = rng.random((m, 5))
+        rates = tables.extras[i, bowling_type]
+        nb = u[:, 0] < rates[:, 0]
+        wd = ~nb & (u[:, 1] < rates[:, 1])
+        lb = ~nb & ~wd & (value == 0) & (u[:, 2] < rates[:, 2])
+        b = ~nb & ~wd & ~lb & (value == 0) & (u[:, 3] < rates[:, 3])
+        extra = nb | wd | lb | b
+        run_out = ~extra & (value <= 1) & (u[:, 4] < tables.run_outs[i, np.minimum(value, 1)])
+        out = ~extra & (value == 7)
+
+        runs = np.where(value == 7, 0, value)
+        runs[wd | lb | b] = 0
+        extras = nb.astype(int)
+        for k, mask in enumerate((wd, lb, b), 1):
+            extras[mask] = sample(tables.extra_runs[i[mask], bowling_type[mask], k], rng)
+
+        total = runs + extras
+        legal = ~(nb | wd)
+        self.legal[r] += legal
+
+        self.batter_stats[r, i, position] += np.column_stack([runs, ~wd])
+        self.bowler_stats[r, i, bowler] += np.column_stack([legal, np.where(lb | b, 0, total), out])
+        self.scores[r, i] += np.column_stack([total, out | run_out])
+
+        striker = (self.striker[r] + np.where(wd, extras - 1, np.where(lb | b, extras, runs))) % 2
+        striker[out] = 1
+        striker[run_out] = rng.integers(0, 2, run_out.sum())
+        striker[self.legal[r] == 6] = 1 - striker[self.legal[r] == 6]
+
+        wicket = np.flatnonzero((out | run_out) & (self.scores[r, i, 1] < 10))
+        dismissed = np.where(out[wicket], self.striker[r[wicket]], rng.integers(0, 2, len(wicket)))
+        rw = r[wicket]
+        self.crease[rw] = np.column_stack([self.crease[rw, 1 - dismissed], self.next_in[rw]])
+        self.next_in[rw] += 1
+        self.striker[r] = striker
+
+    def _outcome(self):
+        s = self.scores
+        played = (self.batting_team >= 0).sum(1)
+        self.winner = np.full(self.n, -1)
+        self.by = np.zeros(self.n, int)
+        self.margin = np.zeros(self.n, int)
+
+        chased = (played == 4) & (s[:, 3, 0] >= self.target)
+        self.winner[chased] = self.batting_team[chased, 3]
+        self.by[chased] = 10 - s[chased, 3, 1]
+        self.margin[chased] = 1
+
+        defended = (played == 4) & ~chased & (s[:, 3, 1] == 10)
+        self.by[defended] = self.target[defended] - s[defended, 3, 0] - 1
+        self.winner[defended] = np.where(self.by[defended], 1 - self.batting_team[defended, 3], -2)
+        self.margin[defended] = np.where(self.by[defended], 2, 0)
+
+        innings = self.target <= 0
+        self.winner[innings] = 1 - self.batting_team[innings, 2]
+        self.by[innings] = 1 - self.target[innings]
+        self.margin[innings] = 3
@@ -1,13 +1,16 @@
 import numpy as np
 import pandas as pd
-from collections import Counter, defaultdict
+from collections import defaultdict, namedtuple
 from copy import deepcopy
 from itertools import chain, zip_longest
 
+from events import EventLog
 from functions import List, attrlister, zero_freqs
 
 
 class PlayerMethods:
+    __slots__ = ()
+
     def __repr__(self):
         return type(self).__name__ + '({})'.format(self)
 
@@ -21,11 +24,67 @@ class PlayerMethods:
         return self.name == getattr(other, 'name', other)
 
 
-class Role(PlayerMethods):
+class FiguresMethods(PlayerMethods):
+    __slots__ = ()
+
+    def __lt__(self, other):
+        if self.balls and other.balls:
+            return self._score() < other._score()
+        return self.balls < other.balls
+
+
+class BatterMethods(FiguresMethods):
+    __slots__ = ()
+
+    @property
+    def out(self):
+        return self.dismissal != 'Not Out'
+
+    @property
+    def strike_rate(self):
+        return '{:.2f}'.format(self.runs / (self.balls + 1e-5) * 100)
+
+    @property
+    def score(self):
+        return '{}{} ({})'.format(self.runs, '' if self.out else '*', self.balls)
+
+    def _score(self):
+        return (self.runs, - self.out, self.balls)
+
+
+class BowlerMethods(FiguresMethods):
+    __slots__ = ()
+
+    @property
+    def overs(self):
+        return self.balls // 6 + (self.balls % 6 / 10 if self.balls % 6 else 0)
+
+    @property
+    def economy(self):
+        return '{:.2f}'.format(self.runs / (self.balls / 6 + 1e-5))
+
+    @property
+    def score(self):
+        return '{} - {} ({})'.format(self.wickets, self.runs, self.overs)
+
+    def _score(self):
+        return (self.wickets, - self.runs, self.overs)
+
+
+class Role(FiguresMethods):
+    __slots__ = ('name', 'style', 'freqs')
+    collect_freqs = False
+
     def __init__(self, player, role):
         self.name = player.name
         self.style = getattr(player, role + '_style')
-        self.freqs = {k: defaultdict(zero_freqs) for k in ('balls', 'style', 'opponent')}
+        self.freqs = None
+
+    def counters(self):
+        if self.freqs is None:
+            self.freqs = {k: defaultdict(zero_freqs) for k in ('balls', 'style', 'opponent')}
+
+        return self.freqs.values()
 
     def __repr__(self):
         return super().__repr__() + ': {}'.format(self.score)
@@ -33,11 +92,6 @@ class Role(PlayerMethods):
     def __floordiv__(self, other):
         return (self.balls - 1) // other
 
-    def __lt__(self, other):
-        if self.balls and other.balls:
-            return self._score() < other._score()
-        return self.balls < other.balls
-
     def __add__(self, other):
         new = deepcopy(self)
         for attr in self._attrs:
@@ -46,31 +100,21 @@ class Role(PlayerMethods):
         return new
 
 
-class Batter(Role):
+class Batter(BatterMethods, Role):
+    __slots__ = ('position', 'true_position', 'runs', 'balls', 'fours', 'sixes', 'dismissal')
+
     def __init__(self, player, *positions):
         super().__init__(player, 'batting')
         self.position, self.true_position = positions
         self.runs = self.balls = self.fours = self.sixes = 0
         self.dismissal = 'Not Out'
 
-    @property
-    def out(self):
-        return self.dismissal != 'Not Out'
-
-    @property
-    def strike_rate(self):
-        return '{:.2f}'.format(self.runs / (self.balls + 1e-5) * 100)
-
-    @property
-    def score(self):
-        return '{}{} ({})'.format(self.runs, '' if self.out else '*', self.balls)
-
-    def _score(self):
-        return (self.runs, - self.out, self.balls)
+    def snapshot(self):
+        return BatterFigures(self.name, self.runs, self.balls, self.dismissal)
 
     def __iadd__(self, other):
         self.runs += int(other)
-        self.balls += 'wd' not in str(other)
+        self.balls += other.value.kind != 'wd'
 
         if 'non_boundary' not in getattr(other, 'data', {}).get('runs', {}):
             self.fours += int(other) == 4
@@ -79,35 +123,26 @@ class Batter(Role):
         return self
 
 
-class Bowler(Role):
+class Bowler(BowlerMethods, Role):
+    __slots__ = ('balls', 'maidens', 'runs', 'wickets', 'extras', 'spells', '_spell')
+
     def __init__(self, player):
         super().__init__(player, 'bowling')
         self.balls = self.maidens = self.runs = self.wickets = self.extras = 0
         self.spells = []
 
-    @property
-    def overs(self):
-        return self.balls // 6 + (self.balls % 6 / 10 if self.balls % 6 else 0)
-
-    @property
-    def economy(self):
-        return '{:.2f}'.format(self.runs / (self.balls / 6 + 1e-5))
-
-    @property
-    def score(self):
-        return '{} - {} ({})'.format(self.wickets, self.runs, self.overs)
-
-    def _score(self):
-        return (self.wickets, - self.runs, self.overs)
+    def snapshot(self):
+        return BowlerFigures(self.name, self.balls, self.runs, self.wickets, getattr(self, '_spell', None))
 
     def __iadd__(self, other):
-        balls = str(other[-1])[1:] not in ('nb', 'wd')
-        runs = abs(other[-1]) if str(other[-1])[1:] not in ('b', 'lb') else 0
-        wickets = other[-1] == 'W'
-        extras = 1 if 'nb' in str(other[-1]) else abs(other[-1]) if 'wd' in str(other[-1]) else 0
+        value = other[-1].value
+        balls = value.legal
+        runs = value.total if value.kind not in ('b', 'lb') else 0
+        wickets = value.wicket == 1
+        extras = 1 if value.kind == 'nb' else value.total if value.kind == 'wd' else 0
 
         if len(other.bowlers) == 1 and abs(other) == 6:
-            maidens = not sum(abs(ball) for ball in other if str(ball)[1:] not in ('b', 'lb'))
+            maidens = not sum(ball.value.total for ball in other if ball.value.kind not in ('b', 'lb'))
 
         for attr, value in locals().items():
             if attr in ('balls', 'maidens', 'runs', 'wickets', 'extras'):
@@ -118,12 +153,21 @@ class Bowler(Role):
         return self
 
 
+class BatterFigures(BatterMethods, namedtuple('BatterFigures', ['name', 'runs', 'balls', 'dismissal'])):
+    __slots__ = ()
+
+
+class BowlerFigures(BowlerMethods, namedtuple('BowlerFigures', ['name', 'balls', 'runs', 'wickets', 'spell'])):
+    __slots__ = ()
+
+
 class MatchMethods:
-    def __init__(self, index, teams, pdb):
+    def __init__(self, index, teams, pdb, info=None):
         self.index = index
         self.teams = teams
-        self.squads = {team: deepcopy(pdb[team]) for team in teams}
-        self.players = {team: List(squad.starting) for team, squad in self.squads.items()}
+        self.squads = {team: pdb[team].view(index) for team in teams}
+        self.players = {team: List(squad.starting if info is None else squad.starting(info))
+                        for team, squad in self.squads.items()}
 
         self.innings = []
 
@@ -151,7 +195,7 @@ class MatchMethods:
 
         for inn in self:
             half = ('1st' if inn.index < 2 else '2nd') + ' Innings'
-            score = '{} ({})'.format(*inn.bat_card.iloc[-1, [2, 3]])
+            score = '{} ({})'.format(*inn.figures()['total'][:2])
             scores = [attrlister(sorted(getattr(inn, attr), reverse=True)[:display], 'name', 'score')
                       for attr in ('batters', 'bowlers')]
             summary.extend([('',) * 4, (inn.batting_team, '', half, score),
@@ -168,6 +212,10 @@ class MatchMethods:
     def __getitem__(self, index):
         return self.innings[index]
 
+    @property
+    def events(self):
+        return EventLog.concat([inn.events for inn in self])
+
 
 class InningMethods:
     def __init__(self, mat, batting_idx):
@@ -189,107 +237,147 @@ class InningMethods:
             self.keeper = None
 
         self.overs = []
+        self.events = EventLog(self.index)
         self.score = np.zeros(2, int)
-        self.freqs = {'overs': defaultdict(zero_freqs),
-                      'extras': {k1: {k2: Counter() for k2 in ('nb', 'wd', 'lb', 'b')} for k1 in 'FS'},
-                      'dismissals': {k: Counter() for k in 'FS'},
-                      'catches': Counter(),
-                      'run_outs': Counter()}
+
+    def figures(self):
+        return self._cached('figures', self._figures)
 
     @property
     def scorecard(self):
-        card = pd.DataFrame([[''] * 6] + [str(over).split() for over in self]).rename_axis('Over').fillna('')
-        card.drop(0, inplace=True)
-        card.columns += 1
-        card.insert(0, 'Bowler', ['/'.join(bowler.name for bowler in over.bowlers) for over in self])
-        card['Score'] = attrlister(self, 'score')
-
-        return card
+        return self._cached('scorecard', self._scorecard).copy()
 
     @property
     def bat_card(self):
-        stats = attrlister(self.batters, 'name', 'dismissal', 'runs', 'balls', 'fours', 'sixes')
-        card = pd.DataFrame(stats, columns=['Name', '', 'R', 'B', '4s', '6s']).set_index('Name')
-        card['S/R'] = (card['R'] / (card['B'] + 1e-5) * 100).apply('{:.2f}'.format)
+        return self._cached('bat_card', self._bat_card).copy()
 
-        try:
-            score = str(self.score[0]) if sum(1 for batter in self.batters if batter.out) == 10 else self[-1].score
-            index = self[-1].index + abs(self[-1]) / 10
-            overs = '{} ov'.format(index if abs(self[-1]) % 6 else round(index))
+    @property
+    def bowl_card(self):
+        return self._cached('bowl_card', self._bowl_card).copy()
+
+    def _cached(self, key, func):
+        events = self.events
+        state = (events.version, events.declared, *events.penalty)
+        cache = self.__dict__.setdefault('_cards', {})
+        if key not in cache or cache[key][0] != state:
+            cache[key] = state, func()
+
+        return cache[key][1]
+
+    def _figures(self):
+        events = self.events
+        batting = [(batter.name, batter.dismissal, *stats, '{:.2f}'.format(stats[0] / (stats[1] + 1e-5) * 100))
+                   for batter, stats in zip(self.batters, events.batting().tolist())]
+        bowling = [(bowler.name, balls // 6 + (balls % 6 / 10 if balls % 6 else 0), maidens, runs, wickets, extras,
+                    '{:.2f}'.format(runs / (balls + 1e-5) * 6))
+                   for bowler, (balls, maidens, runs, wickets, extras) in zip(self.bowlers, events.bowling().tolist())]
+
+        if len(events):
+            runs, wickets = events.scores()
+            balls = events.legal()[events['over'] == events['over'][-1]].sum()
+            if sum(1 for batter in self.batters if batter.out) == 10:
+                score = str(self.score[0])
+            else:
+                score = '{} - {}'.format(runs[-1], wickets[-1]) + ('d' if events.declared else '')
+            index = events['over'][-1] + balls / 10
+            overs = '{} ov'.format(index if balls % 6 else round(index))
             run_rate = 'RR: {:.2f}'.format(self.score[0] / (int(index) + index % 1 / 0.6 + 1e-5))
-            extras = 'Extras: {}'.format(self.score[0] - sum(card['R']))
-            card.loc[self.batting_team] = ['', '', score, overs, run_rate, extras]
-        except IndexError:
-            card.loc[self.batting_team] = ['', '', '0 - 0', '0 ov', 'RR: 0.00', 'Extras: 0']
+            extras = 'Extras: {}'.format(self.score[0] - sum(row[2] for row in batting))
+            total = (score, overs, run_rate, extras)
+        else:
+            total = ('0 - 0', '0 ov', 'RR: 0.00', 'Extras: 0')
+
+        return {'batting': batting, 'bowling': bowling, 'total': total}
+
+    def _scorecard(self):
+        events = self.events
+        over = events['over']
+        runs, wickets = events.scores()
+        last = np.r_[np.flatnonzero(np.diff(over)), len(events) - 1] if len(events) else []
+
+        card = pd.DataFrame({'Over': over + 1, 'Ball': np.arange(len(events)) - np.searchsorted(over, over) + 1,
+                             'Value': events.values()})
+        card = card.pivot(index='Over', columns='Ball', values='Value')
+        card = card.reindex(columns=range(1, max(6, len(card.columns)) + 1)).fillna('').rename_axis(None, axis=1)
+
+        bowlers = pd.DataFrame({'Over': over + 1, 'Bowler': events['bowler']}).drop_duplicates()
+        names = np.array(events.names['bowlers'] + [''], object)
+        card.insert(0, 'Bowler', bowlers.groupby('Over')['Bowler'].agg(lambda codes: '/'.join(names[codes])))
+        card['Score'] = ['{} - {}'.format(*score) for score in zip(runs[last], wickets[last])]
+        if events.declared and len(card):
+            card.iloc[-1, -1] += 'd'
 
         return card
 
-    @property
-    def bowl_card(self):
-        stats = attrlister(self.bowlers, 'name', 'balls', 'overs', 'maidens', 'runs', 'wickets', 'extras')
-        card = pd.DataFrame(stats, columns=['Name', 'B', 'O', 'M', 'R', 'W', 'Extras']).set_index('Name')
-        card['Econ'] = (card['R'] / (card['B'] + 1e-5) * 6).apply('{:.2f}'.format)
-        card.drop('B', axis=1, inplace=True)
-        card.loc[self.bowling_team] = list(self.bat_card.iloc[-1])
+    def _bat_card(self):
+        figures = self.figures()
+        card = pd.DataFrame([row[1:] for row in figures['batting']], attrlister(self.batters, 'name'),
+                            ['', 'R', 'B', '4s', '6s', 'S/R']).rename_axis('Name')
+        card.loc[self.batting_team] = ['', '', *figures['total']]
+
+        return card
+
+    def _bowl_card(self):
+        figures = self.figures()
+        card = pd.DataFrame([row[1:] for row in figures['bowling']], attrlister(self.bowlers, 'name'),
+                            ['O', 'M', 'R', 'W', 'Extras', 'Econ']).rename_axis('Name')
+        card.loc[self.bowling_team] = ['', '', *figures['total']]
 
         return card
 
     @property
     def fow(self):
-        return ['{} ({}, {} ov)'.format(ball.score, ball.batter if ball.batter.out else ball.non_striker, ball.index)
-                for ball in self.wickets() if 'W' in str(ball)]
+        names = self.events.names['batters']
+
+        return ['{} - {} ({}, {} ov)'.format(runs, wickets, names[out], over + ball / 10)
+                for _, runs, wickets, out, over, ball in self.events.falls()]
 
     @property
     def pships(self):
-        try:
-            pships = attrlister(self.wickets(), 'pship')
-            last = self[-1][-1] if self[-1] else self[-2][-1]
-            if last.pship not in pships:
-                pships.append(last.pship)
-            return pships
-        except IndexError:
-            return []
+        names = self.events.names['batters']
+
+        return ['{4}{8} ({5}) ({6} {0} ({1}), {7} {2} ({3}))'.format(*figures, names[first], names[second],
+                                                                       '' if wicket else '*')
+                for first, second, *figures, wicket in self.events.partnerships().tolist()]
 
     def balls(self):
         return list(chain(*self))
 
-    def wickets(self):
-        return [ball for ball in self.balls() if 'W' in str(ball) or 'wickets' in getattr(ball, 'd', {})]
-
-    def update(self, at_crease, striker, bowler, pship, mat, *args):
+    def update(self, at_crease, striker, bowler, mat, *args):
         over = *_, ball = self[-1]
+        value = ball.value
         batter = at_crease[striker]
         batter += ball
         bowler += over
 
-        if 'W' in str(ball) or 'wickets' in getattr(ball, 'data', {}):
-            self._get_dismissal(bowler, pship, mat.index, at_crease, striker, *args)
-            pship[:] = 0
+        code = self.events.code
+        self.events.append(over.index, abs(over) + (not value.legal), code('batters', batter.name),
+                           code('batters', at_crease[1 - striker].name), code('bowlers', bowler.name), value.runs,
+                           value.extras, value.kind, 'non_boundary' in getattr(ball, 'data', {}).get('runs', {}))
+
+        if value.wicket or 'wickets' in getattr(ball, 'data', {}):
+            self._get_dismissal(bowler, mat.index, at_crease, striker, *args)
 
         try:
             self._next_striker(striker, args[-1])
         except AttributeError:
             pass
 
-        for d, k in zip((self.freqs['overs'], *batter.freqs.values(), *bowler.freqs.values()),
-                        (self // 60, batter // 20, bowler.style, bowler.name, bowler // 30, batter.style, batter.name)):
-            if ball == 'W':
-                d[k][7] += 1
-            elif int(ball) > 6:
-                d[k][int(ball) - 4] += 1
-            elif 'wd' not in str(ball):
-                d[k][int(ball)] += 1
-
-        if str(ball)[1:] in ('nb', 'wd', 'lb', 'b'):
-            self.freqs['extras'][bowler.style[-1]][ball.value[1:]][abs(ball)] += 1
+        if Role.collect_freqs:
+            for d, k in zip((*batter.counters(), *bowler.counters()),
+                            (batter // 20, bowler.style, bowler.name, bowler // 30, batter.style, batter.name)):
+                if value.wicket == 1:
+                    d[k][7] += 1
+                elif value.runs > 6:
+                    d[k][value.runs - 4] += 1
+                elif value.kind != 'wd':
+                    d[k][value.runs] += 1
 
-        ball.batter = deepcopy(batter)
-        ball.non_striker = deepcopy(at_crease[1 - striker])
-        ball.bowler = over.bowlers[-1] = deepcopy(bowler)
+        ball.batter = batter.snapshot()
+        over.bowlers[-1] = bowler.snapshot()
 
-    def get_dismissal(self, mode, bowler, fielders, match_idx):
-        if 'retired' not in mode and mode != 'run out':
-            self.freqs['dismissals'][bowler.style[-1]][mode] += 1
+    def get_dismissal(self, out, mode, bowler, fielders, match_idx):
+        self.events.dismiss(self.events.code('batters', str(out)), mode, fielders[0] if fielders else None)
 
         if mode == 'bowled':
             return 'b {}'.format(bowler)
@@ -297,9 +385,6 @@ class InningMethods:
             return 'lbw b {}'.format(bowler)
         elif mode == 'caught':
             if not isinstance(fielders[0], str):
-                only_fielders = self.fielders.copy()
-                only_fielders.remove(bowler)
-                self.freqs['catches'][min(8, only_fielders.index(fielders[0]))] += 1
                 fielders[0].innings[match_idx]['fielding'][self.index]['catches'] += 1
                 return 'c {} b {}'.format(fielders[0], bowler)
             return 'c sub ({}) b {}'.format(fielders[0], bowler)
@@ -317,7 +402,6 @@ class InningMethods:
                 return 'st {} b {}'.format(fielders[0], bowler)
             return 'st sub ({}) b {}'.format(fielders[0], bowler)
         elif mode == 'run out':
-            self.freqs['run_outs'][abs(self[-1][-1])] += 1
             real_fielders = [fielder for fielder in fielders if not isinstance(fielder, str)]
             if len(real_fielders) == 1:
                 real_fielders[0].innings[match_idx]['fielding'][self.index]['run outs'] += 1
@@ -339,6 +423,7 @@ class InningMethods:
         batter = Batter(player, len(self.batters), mat.players[self.batting_team].index(player))
         mat.players[self.batting_team][batter].innings[mat.index]['batting'][self.index] = batter
         self.batters.append(batter)
+        self.events.code('batters', batter.name)
 
         return batter
 
@@ -346,11 +431,12 @@ class InningMethods:
         bowler = Bowler(player)
         mat.players[self.bowling_team][bowler].innings[mat.index]['bowling'][self.index] = bowler
         self.bowlers.append(bowler)
+        self.events.code('bowlers', bowler.name)
 
         return bowler
 
     def __repr__(self):
-        return type(self).__name__ + '({}): {} - {}, {}'.format(self.index, *self.score, self.bat_card.iloc[-1, 3])
+        return type(self).__name__ + '({}): {} - {}, {}'.format(self.index, *self.score, self.figures()['total'][1])
 
     def __len__(self):
         return len(self.overs)
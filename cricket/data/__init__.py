@@ -1,4 +1,17 @@
-from .loader import *  # noqa
-from .cricsheet_match import *  # noqa
-from .cricsheet_inning import *  # noqa
-from .cricsheet_data import *  # noqa
+from importlib import import_module
+
+_modules = ['loader', 'cricsheet_match', 'cricsheet_inning', 'cricsheet_data', 'fixture_server']
+
+
+def __getattr__(name):
+    if name in _modules:
+        return import_module('.' + name, __name__)
+
+    if not name.startswith('_'):
+        for module in _modules:
+            module = import_module('.' + module, __name__)
+            if hasattr(module, name):
+                globals()[name] = value = getattr(module, name)
+                return value
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
@@ -1,21 +1,43 @@
 """
-This module updates stored shelve files with data from new matches.
+This module updates stored shelve files with data from new matches. Nothing is
+run on import; call `main` or run this module as a script to ingest matches.
 """
 
+import json
 import shelve
+import traceback
+import multiprocessing as mp
+import numpy as np
 import pandas as pd
 from collections import Counter, defaultdict
-from itertools import chain
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 
 from functions import attrlister, total_dicts
-from loader import get_filenames
-from cricsheet_match import RealSquad, RealMatch
+from events import kinds
+from tables import bowling_types, extras_types, outcomes
+from loader import get_filenames, get_registry, get_source, load_match, match_hash, set_lock
+from cricsheet_match import MatchRecord, RealSquad, RealMatch
 
 
-def get_matches(pdb_name=None, mdb_name=None, fnames=None, start_date=None, end_date=None, all_teams=None):
+def get_matches(pdb_name=None, mdb_name=None, fnames=None, start_date=None, end_date=None, all_teams=None,
+                workers=None, update=False):
     """
     Updates databases with new players and matches.
 
+    Matches are replayed in parallel against empty squads with
+    `replay_match`, then merged into the databases in the order of `fnames`,
+    so the result does not depend on the number of workers. Matches that
+    fail are reported rather than stopping the run. Players that have not
+    been seen before are retrieved concurrently before any match is replayed.
+
+    The hash of every ingested file is kept in a manifest next to the
+    matches database. When updating, only new or changed files are replayed
+    and their players are merged into the existing squads, with the innings
+    of a changed match replaced. Files in the manifest that are no longer in
+    the source are removed, along with the innings of their players.
+
     Parameters
     ----------
     pdb_name : str, optional
@@ -30,15 +52,20 @@ def get_matches(pdb_name=None, mdb_name=None, fnames=None, start_date=None, end_
         Upper bound for start date of match. The default is None.
     all_teams : list, optional
         List of whitelisted teams. The default is None.
+    workers : int, optional
+        number of processes. The default is None, which uses all cores.
+    update : bool, optional
+        whether to add to the existing databases rather than rebuild them.
+        The default is False.
 
     Returns
     -------
-    str
-        if there is an error, likely because of an unseen event,
-        returns filename that caused the error.
-
     dicts
         updated player and matches database.
+    dict
+        filenames that were 'added', 'changed' and 'removed', and the
+        traceback for each filename that 'failed', likely because of an unseen
+        event.
 
     """
     if all_teams == 'main':
@@ -48,98 +75,863 @@ def get_matches(pdb_name=None, mdb_name=None, fnames=None, start_date=None, end_
     if fnames is None:
         fnames = list(get_filenames(all_teams, start_date, end_date))
 
-    if pdb_name is None:
-        pdb = {}
-    else:
-        pdb = shelve.open(pdb_name, 'n')
+    flag = 'c' if update else 'n'
 
-    pdb.update({team: RealSquad(team) for team in all_teams})
+    pdb = PlayerStore({} if pdb_name is None else shelve.open(pdb_name, flag))
 
-    if mdb_name is None:
-        mdb = {}
-    else:
-        mdb = shelve.open(mdb_name, 'n')
+    mdb = MatchStore({} if mdb_name is None else shelve.open(mdb_name, flag))
+
+    manifest = load_manifest(mdb_name) if update else {}
+    report = {'added': [], 'changed': [], 'removed': [], 'failed': {}}
+    hashes = {}
 
     for fname in fnames:
         try:
-            m = RealMatch(fname, pdb)
-            m.run(pdb)
-            mdb[fname] = m
-        except:
-            return fname
+            hashes[fname] = match_hash(fname)
+        except OSError:
+            report['failed'][fname] = traceback.format_exc()
+
+    fnames = [fname for fname in fnames if fname in hashes and manifest.get(fname) != hashes[fname]]
+    removed = [fname for fname in manifest if fname not in get_source()]
+    squads = {}
+
+    for fname in fnames + removed:
+        if fname in manifest and fname in mdb:
+            index = match_index(fname)
+            for team in mdb[fname].teams:
+                load_squads(pdb, squads, [team])
+                for player in squads[team]:
+                    player.forget(index)
+                pdb[team] = squads[team]
+
+    for fname in removed:
+        if fname in mdb:
+            del mdb[fname]
+        del manifest[fname]
+        report['removed'].append(fname)
+
+    prefetch_players(fnames)
+
+    with ProcessPoolExecutor(workers, initializer=set_lock, initargs=(mp.Lock(),)) as pool:
+        for fname, (m, error) in zip(fnames, pool.map(replay_match, fnames)):
+            if error is None:
+                load_squads(pdb, squads, m.squads)
+                merge_squads(squads, m.squads)
+                for team in m.squads:
+                    pdb[team] = squads[team]
+                mdb[fname] = MatchRecord(m)
+                report['changed' if fname in manifest else 'added'].append(fname)
+                manifest[fname] = hashes[fname]
+            else:
+                report['failed'][fname] = error
+
+    for team in sorted({*(all_teams or ())} - {*pdb}):
+        pdb[team] = RealSquad(team)
+
+    pdb.flush()
+    mdb.flush()
+    save_manifest(mdb_name, manifest)
+
+    return pdb, mdb, report
+
+
+class PlayerStore(MutableMapping):
+    def __init__(self, db, batch=500):
+        """
+        Store the player database by player, rather than pickling each squad
+        whole. Each player is kept under their registry identifier without
+        their innings, the innings of each match they played are kept under
+        their own key, and each team keeps an index of the identifiers of its
+        players. Squads are assembled from their players when first read and
+        kept for the rest of the session.
+
+        Storing a squad only writes the innings and careers of players that
+        have changed since they were last read or written, so the cost of
+        storing a match does not grow with the database. Writes are held and
+        applied together once `batch` keys are waiting, or on `flush`.
+
+        Parameters
+        ----------
+        db : dict or shelve.Shelf
+            underlying key-value store.
+        batch : int, optional
+            number of waiting writes that are applied at once. The default is
+            500.
+
+        Raises
+        ------
+        ValueError
+            `db` holds whole squads written before players were stored
+            separately, and must be rebuilt.
+
+        Returns
+        -------
+        None.
+
+        """
+        if len(db) and 'teams' not in db:
+            raise ValueError('players database holds whole squads; rebuild it with update=False')
+
+        self.db = db
+        self.batch = batch
+        self._pending = {}
+        self._squads = {}
+        self._indexes = {}
+        self._stored = {}
+
+    def player(self, identifier):
+        """
+        Read one player with their innings, without reading their team.
+
+        Parameters
+        ----------
+        identifier : str
+            unique identifier of player.
+
+        Returns
+        -------
+        Player
+            stored player.
+
+        """
+        player = copy(self._get('player/' + identifier))
+        player.career = player.career.copy()
+        player.innings = defaultdict(player._init_innings, {mat_idx: self._get(self._innings_key(identifier, mat_idx))
+                                                            for mat_idx in player.career.matches})
+        self._stored[identifier] = player.career.matches.copy()
+
+        return player
+
+    def flush(self):
+        """
+        Apply every waiting write to the underlying store.
+
+        Returns
+        -------
+        None.
+
+        """
+        for key, value in self._pending.items():
+            if value is None:
+                self.db.pop(key, None)
+            else:
+                self.db[key] = value
+
+        self._pending.clear()
+        if hasattr(self.db, 'sync'):
+            self.db.sync()
+
+    def close(self):
+        """
+        Apply every waiting write and close the underlying store.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.flush()
+        if hasattr(self.db, 'close'):
+            self.db.close()
+
+    def _get(self, key, default=KeyError):
+        try:
+            value = self._pending[key] if key in self._pending else self.db[key]
+        except KeyError:
+            value = None
+
+        if value is None:
+            if default is KeyError:
+                raise KeyError(key)
+            return default
+
+        return value
+
+    def _put(self, key, value):
+        self._pending[key] = value
+        if len(self._pending) >= self.batch:
+            self.flush()
+
+    def _write(self, player):
+        identifier = getattr(player, 'identifier', player.name)
+        stored = self._stored.get(identifier)
+        if stored is None:
+            header = self._get('player/' + identifier, None)
+            stored = {} if header is None else dict.fromkeys(header.career.matches)
+
+        matches = player.career.matches
+        changed = [mat_idx for mat_idx, figures in matches.items() if stored.get(mat_idx) is not figures]
+        removed = [mat_idx for mat_idx in stored if mat_idx not in matches]
+
+        if changed or removed:
+            for mat_idx in changed:
+                self._put(self._innings_key(identifier, mat_idx), player.innings[mat_idx])
+            for mat_idx in removed:
+                self._put(self._innings_key(identifier, mat_idx), None)
+
+            header = copy(player)
+            header.innings = {}
+            header.career = player.career.copy()
+            self._put('player/' + identifier, header)
+
+        self._stored[identifier] = matches.copy()
+
+        return identifier
+
+    @staticmethod
+    def _innings_key(identifier, mat_idx):
+        return 'innings/{}/{}'.format(identifier, mat_idx)
+
+    def __getitem__(self, team):
+        if team not in self._squads:
+            index = self._get('team/' + team)
+            squad = RealSquad(team)
+            for name, identifier in index.items():
+                squad.players[name] = self.player(identifier)
+
+            self._squads[team] = squad
+            self._indexes[team] = index
+
+        return self._squads[team]
+
+    def __setitem__(self, team, squad):
+        index = {name: self._write(player) for name, player in squad.players.items()}
+        if index != self._indexes.get(team):
+            self._put('team/' + team, index)
+            self._indexes[team] = index
+
+        if team not in self:
+            self._put('teams', [*self, team])
+
+        self._squads[team] = squad
+
+    def __delitem__(self, team):
+        if team not in self:
+            raise KeyError(team)
+
+        self._put('teams', [name for name in self if name != team])
+        self._put('team/' + team, None)
+        self._squads.pop(team, None)
+        self._indexes.pop(team, None)
+
+    def __contains__(self, team):
+        return team in self._squads or team in self._get('teams', [])
+
+    def __iter__(self):
+        return iter(self._get('teams', []))
+
+    def __len__(self):
+        return len(self._get('teams', []))
+
+
+class MatchStore(MutableMapping):
+    def __init__(self, db):
+        """
+        Store the matches database as compact match records, with the
+        details of each match and each of its innings under their own keys,
+        so that reading a match only reads its details and its innings are
+        read when first used. The list of stored matches is only written on
+        `flush`, rather than with every match.
+
+        Parameters
+        ----------
+        db : dict or shelve.Shelf
+            underlying key-value store.
+
+        Raises
+        ------
+        ValueError
+            `db` holds whole matches written before matches were stored as
+            records, and must be rebuilt.
+
+        Returns
+        -------
+        None.
+
+        """
+        if len(db) and 'matches' not in db:
+            raise ValueError('matches database holds whole matches; rebuild it with update=False')
+
+        self.db = db
+        self._fnames = db.get('matches', [])
+        self._changed = False
+
+    def inning(self, fname, index):
+        """
+        Read one inning of a match, without reading the rest of the match.
+
+        Parameters
+        ----------
+        fname : str
+            filename of match.
+        index : int
+            inning index.
+
+        Returns
+        -------
+        InningRecord
+            stored inning.
 
-    return pdb, mdb
+        """
+        return self.db['inning/{}/{}'.format(fname, index)]
 
+    def flush(self):
+        """
+        Write the list of stored matches and sync the underlying store.
 
-def get_freqs(pdb, mdb, fdb_name):
+        Returns
+        -------
+        None.
+
+        """
+        if self._changed:
+            self.db['matches'] = self._fnames
+            self._changed = False
+
+        if hasattr(self.db, 'sync'):
+            self.db.sync()
+
+    def close(self):
+        """
+        Write the list of stored matches and close the underlying store.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.flush()
+        if hasattr(self.db, 'close'):
+            self.db.close()
+
+    def __getitem__(self, fname):
+        record = copy(self.db['match/' + fname])
+        record.innings = LazyInnings(self, fname, record.innings)
+
+        return record
+
+    def __setitem__(self, fname, record):
+        if fname in self:
+            del self[fname]
+
+        header = copy(record)
+        header.innings = len(record.innings)
+        for i, inn in enumerate(record.innings):
+            self.db['inning/{}/{}'.format(fname, i)] = inn
+        self.db['match/' + fname] = header
+
+        self._fnames.append(fname)
+        self._changed = True
+
+    def __delitem__(self, fname):
+        if fname not in self:
+            raise KeyError(fname)
+
+        for i in range(self.db['match/' + fname].innings):
+            del self.db['inning/{}/{}'.format(fname, i)]
+        del self.db['match/' + fname]
+
+        self._fnames.remove(fname)
+        self._changed = True
+
+    def __contains__(self, fname):
+        return fname in self._fnames
+
+    def __iter__(self):
+        return iter(self._fnames.copy())
+
+    def __len__(self):
+        return len(self._fnames)
+
+
+class LazyInnings:
+    def __init__(self, store, fname, n):
+        """
+        Innings of a stored match, read from the store when first used.
+
+        Parameters
+        ----------
+        store : MatchStore
+            store of the match.
+        fname : str
+            filename of match.
+        n : int
+            number of innings.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.store = store
+        self.fname = fname
+        self._innings = [None] * n
+
+    def __len__(self):
+        return len(self._innings)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+
+        if self._innings[index] is None:
+            self._innings[index] = self.store.inning(self.fname, range(len(self))[index])
+
+        return self._innings[index]
+
+
+def match_index(fname):
     """
-    Update stored frequencies from new matches.
+    Get the index of a match from its filename.
+
+    Parameters
+    ----------
+    fname : str
+        filename of match.
+
+    Returns
+    -------
+    int
+        match index.
+
+    """
+    return int(fname.replace('.json', ''))
+
+
+def load_manifest(mdb_name):
+    """
+    Load the hash of every file in the matches database.
+
+    Parameters
+    ----------
+    mdb_name : str or None
+        name of matches database.
+
+    Returns
+    -------
+    dict
+        hash of each filename, empty if there is no manifest.
+
+    """
+    try:
+        with open(mdb_name + '_manifest.json') as f:
+            return json.load(f)
+    except (TypeError, OSError):
+        return {}
+
+
+def save_manifest(mdb_name, manifest):
+    """
+    Store the hash of every file in the matches database.
+
+    Parameters
+    ----------
+    mdb_name : str or None
+        name of matches database. Nothing is stored if None.
+    manifest : dict
+        hash of each filename.
+
+    Returns
+    -------
+    None.
+
+    """
+    if mdb_name is not None:
+        with open(mdb_name + '_manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=0, sort_keys=True)
+
+
+def prefetch_players(fnames, **kwargs):
+    """
+    Scan matches for players without stored information and retrieve them
+    all concurrently. Players that fail are retrieved again when their match
+    is replayed.
+
+    Parameters
+    ----------
+    fnames : list
+        filenames of matches.
+    **kwargs
+        passed to `fetch_player_infos`.
+
+    Returns
+    -------
+    dict
+        error of each identifier that could not be retrieved.
+
+    """
+    players = {}
+    for fname in fnames:
+        try:
+            info = load_match(fname)['info']
+        except (OSError, ValueError):
+            continue
+
+        people = info['registry']['people']
+        players.update((people[name], name) for names in info['players'].values() for name in names)
+
+    return get_registry().prefetch(players, **kwargs)
+
+
+def replay_match(fname):
+    """
+    Replay a match against empty squads, so that it can be run independently
+    of every other match.
+
+    Parameters
+    ----------
+    fname : str
+        filename of match.
+
+    Returns
+    -------
+    RealMatch
+        replayed match, or None if there is an error.
+    str
+        traceback of error, or None.
+
+    """
+    try:
+        data = load_match(fname)
+        pdb = {team: RealSquad(team) for team in data['info']['teams']}
+        m = RealMatch(fname, pdb, data)
+        m.run(pdb)
+        return m, None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def load_squads(pdb, squads, teams):
+    """
+    Read the stored squads of teams into the squads being updated, so that
+    only the teams of ingested matches are read from the player database.
+
+    Parameters
+    ----------
+    pdb : PlayerStore
+        player database.
+    squads : dict
+        squads being updated.
+    teams : iterable
+        names of teams.
+
+    Returns
+    -------
+    None.
+
+    """
+    for team in teams:
+        if team not in squads:
+            squads[team] = pdb[team] if team in pdb else RealSquad(team)
+
+
+def merge_squads(squads, new):
+    """
+    Merge the players of replayed squads into the player database. Players
+    seen before have the innings of the new match added to their history and
+    career totals.
+
+    Parameters
+    ----------
+    squads : dict
+        squads of player database.
+    new : dict
+        squads from a replayed match.
+
+    Returns
+    -------
+    None.
+
+    """
+    for team, squad in new.items():
+        players = squads.setdefault(team, RealSquad(team)).players
+        for name, player in squad.players.items():
+            if name in players:
+                players[name].innings.update(player.innings)
+                players[name].record(*player.innings)
+            else:
+                players[name] = player
+                player.record()
+
+
+def ball_table(match):
+    """
+    Label every delivery of a match with the features that its outcome is
+    counted under, in one flat table.
+
+    Outcomes are coded as their index in `outcomes`, or -1 for wides, which
+    are not counted as balls faced. Extras types and wicket kinds are empty
+    strings for none, and catches are the fielding position of the catcher,
+    or -1 for none.
+
+    Parameters
+    ----------
+    match : MatchRecord
+        ingested match.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        one row for each delivery, or None if the match has no innings.
+
+    """
+    tables = []
+
+    for inn in match:
+        events = inn.events
+
+        striker, bowler, over, runs = events['striker'], events['bowler'], events['over'], events['runs']
+        legal, faced = events.legal(), events.faced()
+        wicket = events.wickets() & (events['wicket'] != kinds.index('run out') + 1)
+        styles = np.array(inn.bowling_styles + [''], object)
+
+        catch = np.full(len(events), -1)
+        for i in np.flatnonzero((events['wicket'] == kinds.index('caught') + 1) & (events['fielder'] >= 0)):
+            fielders = inn.fielders.copy()
+            name = events.names['bowlers'][bowler[i]]
+            if name in fielders:
+                fielders.remove(name)
+            fielder = events.names['fielders'][events['fielder'][i]]
+            if fielder in fielders:
+                catch[i] = min(8, fielders.index(fielder))
+
+        tables.append(pd.DataFrame({
+            'match': match.index,
+            'inning': inn.index,
+            'position': np.array([min(10, position) for position in inn.positions], int)[striker],
+            'batter_bucket': (running_count(faced, striker) - 1) // 20,
+            'batting_style': np.array(inn.batting_styles, object)[striker],
+            'bowling_type': np.array([style[-1] for style in styles[:-1]] + [''], object)[bowler],
+            'part_time': np.array(['Batter' in role for role in inn.roles], bool)[bowler],
+            'bowler_bucket': (running_count(legal, bowler) - 1) // 30,
+            'bowling_style': styles[bowler],
+            'over_bucket': (6 * over + np.maximum(0, running_count(legal, over) - 1)) // 60,
+            'outcome': np.where(faced, np.where(wicket, 7, np.where(runs > 6, runs - 4, runs)), -1),
+            'extras_type': np.array(['', *extras_types], object)[events['extras_type']],
+            'runs': runs + events['extras'],
+            'wicket': np.array(['', *kinds], object)[events['wicket']],
+            'catch': catch}))
+
+    return pd.concat(tables, ignore_index=True) if tables else None
+
+
+def running_count(flags, groups):
+    """
+    Count flagged deliveries within each group, up to and including each
+    delivery.
 
     Parameters
     ----------
-    pdb : dict
-        player databse.
-    mdb : dict
-        matches database.
-    fdb_name : TYPE
-        frequencey databse name.
+    flags : np.array
+        whether each delivery is counted.
+    groups : np.array
+        group of each delivery.
 
     Returns
     -------
-    freqs : TYPE
-        DESCRIPTION.
-
-    """
-    freqs = [{**{k: defaultdict(Counter) for k in ('batting', 'bowling', 'style', 'dismissals')},
-              **{k: Counter() for k in ('overs', 'catches', 'run_outs')},
-              **{k1: {k2: defaultdict(Counter) for k2 in 'FS'} for k1 in ('bowling', 'extras')}}
-             for _ in range(5)]
-    toss = Counter()
-
-    for player in chain(*pdb.values()):
-        for _, innings in player.innings.items():
-            for i, inning in innings['batting'].items():
-                for key in (i, 4):
-                    freqs[key]['batting'][min(10, inning.true_position)].update(inning.freqs['balls'])
-                    freqs[key]['style'][player.batting_style].update(inning.freqs['style'])
-
-            for i, inning in innings['bowling'].items():
-                for key in (i, 4):
-                    (freqs[key]['bowling'][player.bowling_style[-1]]['part_time' if 'Batter' in player.role else 'main']
-                      .update(inning.freqs['balls']))
-
-    for match in mdb.values():
-        toss[match.data['info']['toss']['decision']] += 1
-        for inning in match:
-            for key in (inning.index, 4):
-                for k in ('overs', 'catches', 'run_outs'):
-                    freqs[key][k].update(inning.freqs[k])
-
-                for k, v in inning.freqs['dismissals'].items():
-                    freqs[key]['dismissals'][k].update(v)
-
-                for k1, v1 in inning.freqs['extras'].items():
-                    for k2, v2 in v1.items():
-                        freqs[key]['extras'][k1][k2].update(v2)
-
-    for d in freqs:
+    np.array
+        running count of each delivery.
+
+    """
+    return pd.Series(flags, dtype=int).groupby(groups).cumsum().to_numpy()
+
+
+def group_counts(balls, keys, outcome=False):
+    """
+    Count the deliveries in each group with the same values of some columns.
+
+    Parameters
+    ----------
+    balls : pd.DataFrame
+        labelled deliveries from `ball_table`.
+    keys : list
+        columns to group by.
+    outcome : bool, optional
+        whether to count each outcome separately. The default is False.
+
+    Returns
+    -------
+    list
+        values of `keys` for each group, with its count, or the frequency
+        vector of its outcomes if `outcome`.
+
+    """
+    grouped = balls.groupby(keys, dropna=False, observed=True)
+    sizes = grouped.size()
+
+    if outcome:
+        n = len(outcomes)
+        counts = np.bincount(grouped.ngroup().to_numpy() * n + balls['outcome'].to_numpy(),
+                             minlength=len(sizes) * n).reshape(-1, n)
+    else:
+        counts = sizes.tolist()
+
+    return list(zip(sizes.index.to_frame().itertuples(index=False, name=None), counts))
+
+
+def count_freqs(balls):
+    """
+    Count the frequencies for each inning and for all innings from a table of
+    labelled deliveries, with a few grouped passes over the table.
+
+    Parameters
+    ----------
+    balls : pd.DataFrame
+        labelled deliveries from `ball_table`.
+
+    Returns
+    -------
+    list
+        frequencies for each inning, then for all innings.
+
+    """
+    freqs = []
+
+    for key in range(5):
+        inn = balls if key == 4 else balls[balls['inning'] == key]
+        faced = inn[inn['outcome'] >= 0]
+        d = {**{k: defaultdict(Counter) for k in ('batting', 'style')},
+             **{k: Counter() for k in ('overs', 'catches', 'run_outs')},
+             'bowling': {k: defaultdict(Counter) for k in bowling_types},
+             'extras': {k1: {k2: Counter() for k2 in extras_types} for k1 in bowling_types},
+             'dismissals': {k: Counter() for k in bowling_types}}
+
+        for (position, bucket), counts in group_counts(faced, ['position', 'batter_bucket'], True):
+            d['batting'][position][bucket] = counts
+
+        for (batting_style, bowling_style), counts in group_counts(faced, ['batting_style', 'bowling_style'], True):
+            d['style'][batting_style][bowling_style] = counts
+
+        for (bowling_type, part_time, bucket), counts in group_counts(faced, ['bowling_type', 'part_time',
+                                                                               'bowler_bucket'], True):
+            d['bowling'][bowling_type]['part_time' if part_time else 'main'][bucket] = counts
+
+        for (bucket,), counts in group_counts(faced, ['over_bucket'], True):
+            d['overs'][bucket] = counts
+
+        for (bowling_type, extras_type, runs), n in group_counts(inn[inn['extras_type'] != ''],
+                                                                 ['bowling_type', 'extras_type', 'runs']):
+            d['extras'][bowling_type][extras_type][runs] = n
+
+        dismissals = inn[inn['wicket'].isin([kind for kind in kinds if kind != 'run out' and 'retired' not in kind])]
+        for (bowling_type, kind), n in group_counts(dismissals, ['bowling_type', 'wicket']):
+            d['dismissals'][bowling_type][kind] = n
+
+        for (position,), n in group_counts(inn[inn['catch'] >= 0], ['catch']):
+            d['catches'][position] = n
+
+        for (runs,), n in group_counts(inn[inn['wicket'] == 'run out'], ['runs']):
+            d['run_outs'][runs] = n
+
         d['style'] = pd.DataFrame(d['style'])
         total_dicts(d)
+        freqs.append(d)
+
+    return freqs
+
 
-    fdb = shelve.open(fdb_name, 'n')
+def get_freqs(mdb, fdb_name, fnames=None):
+    """
+    Update stored frequencies from new matches.
+
+    Every delivery is labelled in one flat table by `ball_table`, which is
+    stored alongside the frequencies. When updating, the rows and toss of
+    every match in `fnames`, and of every match no longer in `mdb`, are
+    dropped, and the matches in `fnames` that are in `mdb` are labelled
+    again, before the frequencies are counted from the whole table.
+
+    Parameters
+    ----------
+    mdb : MatchStore or dict
+        matches database of match records.
+    fdb_name : str
+        frequency database name.
+    fnames : list, optional
+        filenames of new, changed or removed matches. The default is None,
+        which labels every match in `mdb` from scratch.
+
+    Returns
+    -------
+    freqs : list
+        frequencies for each inning, then for all innings.
+
+    """
+    fdb = shelve.open(fdb_name, 'c')
+
+    if fnames is None or 'balls' not in fdb:
+        balls, tosses, fnames = None, {}, list(mdb)
+    else:
+        balls, tosses = fdb['balls'], fdb['tosses']
+
+    if balls is not None:
+        stored = {match_index(fname) for fname in mdb} - {match_index(fname) for fname in fnames}
+        balls = balls[balls['match'].isin(stored)]
+        tosses = {index: decision for index, decision in tosses.items() if index in stored}
+
+    tables = []
+    for fname in fnames:
+        if fname in mdb:
+            match = mdb[fname]
+            tables.append(ball_table(match))
+            tosses[match.index] = match.toss['decision']
+
+    balls = pd.concat([balls, *tables], ignore_index=True)
+    freqs = count_freqs(balls)
+
+    fdb['balls'], fdb['tosses'] = balls, tosses
     *fdb['innings'], fdb['total'] = freqs
-    fdb['toss'] = toss
+    fdb['toss'] = Counter(tosses.values())
     fdb.close()
 
     return freqs
 
 
-pdb_name = 'real_players'
-mdb_name = 'real_matches'
-dates = ['2019-08-01', '2021-06-23']
-err = get_matches(pdb_name, mdb_name, 'main', *dates)
+def main(pdb_name='real_players', mdb_name='real_matches', fdb_name='real_freqs', start_date='2019-08-01',
+         end_date='2021-06-23', all_teams='main', update=False):
+    """
+    Ingest matches into the player and matches databases, then update the
+    stored frequencies and collect career statistics.
+
+    When updating, only new or changed matches are ingested and labelled
+    before the stored frequencies are counted again.
+
+    Parameters
+    ----------
+    pdb_name : str, optional
+        name of players database. The default is 'real_players'.
+    mdb_name : str, optional
+        name of matches database. The default is 'real_matches'.
+    fdb_name : str, optional
+        name of frequency database. The default is 'real_freqs'.
+    start_date : str, optional
+        Lower bound for start date of match. The default is '2019-08-01'.
+    end_date : str, optional
+        Upper bound for start date of match. The default is '2021-06-23'.
+    all_teams : list, optional
+        List of whitelisted teams. The default is 'main'.
+    update : bool, optional
+        whether to add to the existing databases rather than rebuild them.
+        The default is False.
+
+    Returns
+    -------
+    dict
+        batting, bowling and fielding statistics of every player.
+
+    """
+    pdb, mdb, report = get_matches(pdb_name, mdb_name, start_date=start_date, end_date=end_date, all_teams=all_teams,
+                                   update=update)
+    for fname, error in report['failed'].items():
+        print(fname, error, sep='\n')
+
+    get_freqs(mdb, fdb_name, report['added'] + report['changed'] + report['removed'] if update else None)
+    stats = {attr: pd.concat(attrlister(pdb.values(), attr), keys=pdb) for attr in ('batting', 'bowling', 'fielding')}
+
+    pdb.close()
+    mdb.close()
+
+    return stats
+
 
-pdb = shelve.open(pdb_name, 'r')
-mdb = shelve.open(mdb_name, 'r')
-freqs = get_freqs(pdb, mdb, 'real_freqs')
-stats = {attr: pd.concat(attrlister(pdb.values(), attr), keys=pdb) for attr in ('batting', 'bowling', 'fielding')}
+if __name__ == '__main__':
+    stats = main()
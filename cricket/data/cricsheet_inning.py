@@ -6,12 +6,11 @@ fromother modules.
 
 
 import numpy as np
-from copy import deepcopy
 from operator import attrgetter, itemgetter
 
-from functions import List
 from classes import Batter, InningMethods
 from inning import Over, Ball
+from events import Outcome, extras_codes
 
 
 class RealInning(InningMethods):
@@ -51,30 +50,30 @@ class RealInning(InningMethods):
         None.
 
         """
-        pship = np.zeros((3, 2), int)
-
         if 'pre' in self.data.get('penalty_runs', {}):
             self.score[0] += self.data['penalty_runs']['pre']
+            self.events.penalty[0] = self.data['penalty_runs']['pre']
 
         for over_data in self.data['overs'][:index[0]]:
-            self._run_over(over_data, pship, mat)
+            self._run_over(over_data, mat)
 
         if index[1] is not None:
-            self._run_over(self.data['overs'][index[0]], pship, mat, index[1])
+            self._run_over(self.data['overs'][index[0]], mat, index[1])
 
         for name in self.data.get('absent_hurt', []):
             player = mat.players[self.batting_team][name]
             batter = Batter(player, None, mat.players[self.batting_team].index(player))
             batter.dismissal = 'absent hurt'
             self.batters.append(batter)
+            self.events.code('batters', batter.name)
 
         if 'post' in self.data.get('penalty_runs', {}):
             self.score[0] += self.data['penalty_runs']['post']
+            self.events.penalty[1] = self.data['penalty_runs']['post']
 
-        if 'declared' in self.data:
-            self[-1][-1].score += 'd'
+        self.events.declared = 'declared' in self.data
 
-    def _run_over(self, data, pship, mat, index=None):
+    def _run_over(self, data, mat, index=None):
         """
         Iterate through over data.
 
@@ -82,8 +81,6 @@ class RealInning(InningMethods):
         ----------
         data : dict
             over data.
-        pship : np.array
-            counter to keep track of current partnership.
         mat : RealMatch
             match object.
         index : int, optional
@@ -98,9 +95,9 @@ class RealInning(InningMethods):
         self.overs.append(Over(bowler, self))
 
         for ball_data in data['deliveries'][:index]:
-            self._run_ball(ball_data, pship, mat)
+            self._run_ball(ball_data, mat)
 
-    def _run_ball(self, data, pship, mat):
+    def _run_ball(self, data, mat):
         """
         Update inning ball-by-ball.
 
@@ -108,8 +105,6 @@ class RealInning(InningMethods):
         ----------
         data : dict
             ball data.
-        pship : np.array
-            counter to keep track of current partnership.
         mat : RealMatch
             match object.
 
@@ -122,7 +117,6 @@ class RealInning(InningMethods):
             for replacement_data in data['replacements'].get('role', []):
                 if replacement_data['role'] == 'batter':
                     self.batters[replacement_data['out']].dismissal = 'retired hurt'
-                    pship[:] = 0
 
         at_crease = sorted([self._get_batter(data[key], mat) for key in ('batter', 'non_striker')],
                            key=attrgetter('position'))
@@ -130,10 +124,10 @@ class RealInning(InningMethods):
         bowler = self._get_bowler(data['bowler'], mat)
         if bowler not in self[-1].bowlers:
             bowler.spells.append(np.zeros(4))
-            self[-1].bowlers.append(deepcopy(bowler))
+            self[-1].bowlers.append(bowler.snapshot())
 
-        self[-1].append(RealBall(data, at_crease, striker, pship, self))
-        super().update(at_crease, striker, bowler, pship, mat)
+        self[-1].append(RealBall(data, self))
+        super().update(at_crease, striker, bowler, mat)
 
     def _get_batter(self, name, mat):
         """
@@ -152,10 +146,11 @@ class RealInning(InningMethods):
             Batter object.
 
         """
-        try:
-            return self.batters[name]
-        except ValueError:
-            return super().new_batter(mat.players[self.batting_team][name], mat)
+        batter = self.batters.get(name)
+        if batter is None:
+            batter = super().new_batter(mat.players[self.batting_team][name], mat)
+
+        return batter
 
     def _get_bowler(self, name, mat):
         """
@@ -174,12 +169,13 @@ class RealInning(InningMethods):
             Bowler object.
 
         """
-        try:
-            return self.bowlers[name]
-        except ValueError:
-            return super().new_bowler(mat.players[self.bowling_team][name], mat)
+        bowler = self.bowlers.get(name)
+        if bowler is None:
+            bowler = super().new_bowler(mat.players[self.bowling_team][name], mat)
 
-    def _get_dismissal(self, bowler, pship, match_idx, *_):
+        return bowler
+
+    def _get_dismissal(self, bowler, match_idx, *_):
         """
         Assign dismissal type from description.
 
@@ -187,8 +183,6 @@ class RealInning(InningMethods):
         ----------
         bowler : Bowler
             Bowler object.
-        pship : np.array
-            counter to keep track of current partnership.
         match_idx : int
             match identifier.
 
@@ -203,13 +197,15 @@ class RealInning(InningMethods):
             if mode == 'caught' and wicket_data['fielders'][0]['name'] == self.keeper:
                 mode = 'caught behind'
 
-            fielders = [List(self.fielders + [self.keeper]).get(*[fielder['name']] * 2)
-                        for fielder in wicket_data.get('fielders', [])]
-            self.batters[out].dismissal = super().get_dismissal(mode, bowler, fielders, match_idx)
+            fielders = [fielder['name'] for fielder in wicket_data.get('fielders', [])]
+            fielders = [self.keeper if name == self.keeper else self.fielders.get(name, name) for name in fielders]
+            self.batters[out].dismissal = super().get_dismissal(out, mode, bowler, fielders, match_idx)
 
 
 class RealBall(Ball):
-    def __init__(self, data, at_crease, striker, pship, inn):
+    __slots__ = ('data',)
+
+    def __init__(self, data, inn):
         """
         Initialise atrributes for each ball.
 
@@ -217,12 +213,6 @@ class RealBall(Ball):
         ----------
         data : dict
             ball data.
-        at_crease : list
-            current batters.
-        striker : int
-            index of current batter on strike.
-        pship : np.array
-            counter to keep track of current partnership.
         inn : RealInning
             associated inning object.
 
@@ -232,11 +222,12 @@ class RealBall(Ball):
 
         """
         self.data = data
-        super().__init__(self._get_value(), at_crease, striker, pship, inn)
+        super().__init__(self._get_value(), inn)
 
     def _get_value(self):
         """
-        Return the number of runs scored by the batting team for each ball.
+        Encode the outcome of each ball. As with the descriptions used
+        before, the extras type is not kept on balls with a wicket.
 
         Raises
         ------
@@ -245,34 +236,33 @@ class RealBall(Ball):
 
         Returns
         -------
-        int
-            Number of runs for that ball.
+        Outcome
+            Runs, extras and wicket for that ball.
 
         """
+        runs = self.data['runs']['batter']
+        extras = self.data['runs']['total'] - runs
+
         if 'wickets' in self.data:
             if self.data['wickets'][0]['kind'] == 'run out':
-                return '{}+W'.format(int(self))
+                return Outcome(runs, 0, extras, 2)
             elif 'retired' in self.data['wickets'][0]['kind']:
-                return int(self)
+                return Outcome(runs, 0, extras, 0)
             else:
-                return 'W'
+                return Outcome(runs, 0, extras, 1)
         elif 'extras' not in self.data:
-            return int(self)
-        elif 'noballs' in self.data['extras']:
-            return '{}nb'.format(int(self))
-        elif 'wides' in self.data['extras']:
-            return '{}wd'.format(abs(self) - 1)
-        elif 'legbyes' in self.data['extras']:
-            return '{}lb'.format(abs(self))
-        elif 'byes' in self.data['extras']:
-            return '{}b'.format(abs(self))
-        elif 'penalty' in self.data['extras']:
-            return 0
+            return Outcome(runs, 0, extras, 0)
+
+        for key, kind in (('noballs', 'nb'), ('wides', 'wd'), ('legbyes', 'lb'), ('byes', 'b')):
+            if key in self.data['extras']:
+                return Outcome(runs, extras_codes[kind], extras, 0)
+
+        if 'penalty' in self.data['extras']:
+            return Outcome(runs, 0, extras, 0)
         else:
             raise ValueError('unseen value: ' + str(self.data))
 
-    def __abs__(self):
-        return self.data['runs']['total']
-
-    def __int__(self):
-        return self.data['runs']['batter']
+    def __setstate__(self, state):
+        self._set_slots(state)
+        if not isinstance(self.value, Outcome):
+            self.value = self._get_value()
@@ -6,9 +6,10 @@ other modules.
 
 from operator import itemgetter
 
-from classes import MatchMethods
+from functions import List
+from classes import InningMethods, MatchMethods
 from squads import Player, Squad
-from loader import load_match, get_player_info
+from loader import load_match, get_player_info, get_registry
 from cricsheet_inning import RealInning
 
 style_map = {'Batting': {'Left hand Bat': 'LH', 'Right hand Bat': 'RH', None: None},
@@ -58,6 +59,7 @@ class RealPlayer(Player):
         None.
 
         """
+        self.identifier = identifier
         self.info = get_player_info(name, identifier)
         role = self.info.get('Playing Role')
         styles = [style_map[key][self.info.get(key + ' Style')] for key in ('Batting', 'Bowling')]
@@ -99,15 +101,17 @@ class RealSquad(Squad):
 
         """
         names = match_info['players'][self.team]
-        for name in names:
-            if name not in self.players:
-                self.players[name] = RealPlayer(name, match_info['registry']['people'][name])
+        new = {match_info['registry']['people'][name]: name for name in names if name not in self.players}
+        get_registry().resolve(new)
+
+        for identifier, name in new.items():
+            self.players[name] = RealPlayer(name, identifier)
 
         return itemgetter(*names)(self)
 
 
 class RealMatch(MatchMethods):
-    def __init__(self, fname, pdb):
+    def __init__(self, fname, pdb, data=None):
         """
         Initialise match from stored database containing data from
         cricsheet.org.
@@ -118,13 +122,16 @@ class RealMatch(MatchMethods):
             filename of match.
         pdb : dict
             player database.
+        data : dict, optional
+            match data, if already loaded. The default is None, which loads
+            it from `fname`.
 
         Returns
         -------
         None.
 
         """
-        self.data = load_match(fname)
+        self.data = load_match(fname) if data is None else data
         info = self.data['info']
 
         index = int(fname.replace('.json', ''))
@@ -159,7 +166,7 @@ class RealMatch(MatchMethods):
             self._run_inning(self.data['innings'][index[0]], self, index[1:])
 
         for team, squad in self.squads.items():
-            pdb[team] = squad
+            pdb[team] = squad.merge()
 
     def _run_inning(self, data, mat, index=(None,)*2):
         """
@@ -202,6 +209,82 @@ class RealMatch(MatchMethods):
             return 'unknown event'
 
 
+class MatchRecord(MatchMethods):
+    def __init__(self, mat):
+        """
+        Compact record of an ingested match, holding its details and the
+        event log of each inning without the cricsheet data, squads or ball
+        objects it was replayed from.
+
+        Parameters
+        ----------
+        mat : RealMatch
+            replayed match.
+
+        Returns
+        -------
+        None.
+
+        """
+        info = mat.data['info']
+
+        self.index = mat.index
+        self.teams = mat.teams
+        self.dates = info['dates']
+        self.event = mat._get_event()
+        self.toss = info['toss']
+        self.outcome = mat.outcome
+        self.player_of_match = mat.player_of_match
+        self.players = {team: [str(player) for player in players] for team, players in mat.players.items()}
+        self.innings = [InningRecord(inn, mat) for inn in mat]
+
+
+class InningRecord(InningMethods):
+    def __init__(self, inn, mat):
+        """
+        Compact record of a replayed inning, from which its cards can be
+        shown and its deliveries labelled. Batters and bowlers are kept as
+        their final figures, and their styles, batting positions and roles
+        are kept in the order of the players of the event log. Overs and
+        balls are not kept, so anything that walks them, such as `len` or
+        `balls`, raises AttributeError; replay the match to get them.
+
+        Parameters
+        ----------
+        inn : RealInning
+            replayed inning.
+        mat : RealMatch
+            replayed match.
+
+        Returns
+        -------
+        None.
+
+        """
+        events = inn.events
+        batters = [inn.batters[name] for name in events.names['batters']]
+        bowlers = [inn.bowlers[name] for name in events.names['bowlers']]
+
+        self.index = inn.index
+        self.batting_team = inn.batting_team
+        self.bowling_team = inn.bowling_team
+        self.events = events
+        self.score = inn.score
+        self.batters = List(batter.snapshot() for batter in inn.batters)
+        self.bowlers = List(bowler.snapshot() for bowler in inn.bowlers)
+        self.fielders = List(str(player) for player in inn.fielders)
+        self.keeper = None if inn.keeper is None else str(inn.keeper)
+
+        self.positions = [batter.true_position for batter in batters]
+        self.batting_styles = [batter.style for batter in batters]
+        self.bowling_styles = [bowler.style for bowler in bowlers]
+        self.roles = [mat.players[self.bowling_team][bowler.name].role for bowler in bowlers]
+
+    @property
+    def overs(self):
+        raise AttributeError('overs are not kept in stored innings; replay the match with RealMatch to get them')
+
+
 if __name__ == '__main__':
     fname = '1249875.json'
     pdb = {team: RealSquad(team) for team in load_match(fname)['info']['teams']}
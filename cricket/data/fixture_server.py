@@ -0,0 +1,93 @@
+"""
+This module serves player pages in the layout of cricinfo, built from the
+stored player information, so that retrieving new players can be tested and
+timed without the network. Run it as a script, or call `serve`, and pass its
+url as `base_url` or set it as `loader.cricinfo_url`.
+"""
+
+import shelve
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loader import Registry
+
+
+def render_player_page(info):
+    """
+    Lay out player information as a cricinfo player page.
+
+    Parameters
+    ----------
+    info : dict
+        attributes of player's role and style.
+
+    Returns
+    -------
+    str
+        player page.
+
+    """
+    rows = ''.join('<div><p>{}</p><span>{}</span></div>'.format(escape(k), escape(v)) for k, v in info.items())
+
+    return ('<html><body><div><section><section><div class="ds-relative"><div><div class="ds-flex ds-space-x-5">'
+            '<div class="ds-grow"><div class="ds-p-4"><div><div>' + rows + '</div></div></div></div></div></div>'
+            '</div></section></section></div></body></html>')
+
+
+def serve(port=0, delay=0, path=None):
+    """
+    Serve player pages from a background thread.
+
+    Parameters
+    ----------
+    port : int, optional
+        port to listen on. The default is 0, which picks a free port.
+    delay : float, optional
+        seconds to wait before answering each request, to stand in for
+        network latency. The default is 0.
+    path : str, optional
+        directory of the registers and the `cricinfo` shelve. The default is
+        None, which uses the working directory.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        running server, with its url as `url`. Call `shutdown` to stop it.
+
+    """
+    registry = Registry(path)
+    identifiers = {str(key): identifier for identifier, key in registry.cricinfo.items()}
+    with shelve.open(registry.path + '/cricinfo', 'r') as db:
+        infos = {identifier: db[identifier] for identifier in db}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            info = infos.get(identifiers.get(self.path.rsplit('-', 1)[-1]))
+            if info is None:
+                self.send_error(404)
+                return
+
+            page = render_player_page(info).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+if __name__ == '__main__':
+    server = serve(8000)
+    print('Serving player pages at', server.url)
+    threading.Event().wait()
@@ -5,19 +5,638 @@ and identifiers from cricsheet.org.
 It also contains functions to load this data from downloaded files, filter
 matches based on start date and teams, and finally to retrieve player
 atrributes from cricinfo.
+
+Importing this module does no I/O. The player registers `people` and `names`
+are read on first use, and `requests` and `bs4` are only imported by the
+functions that download data. Lookups by identifier go through a `Registry`,
+which indexes both registers in dictionaries and keeps one open handle to the
+stored player information. New players can be retrieved from cricinfo
+concurrently, from `cricinfo_url` or any other base url such as a local
+fixture server.
+
+Matches are read straight from the downloaded cricsheet archive, along with
+any archives of recently added matches, through a `MatchArchive`. Folders of
+extracted matches are still read through a `MatchDirectory`. Matches are
+selected from a `MatchCatalog`, which is stored between runs and indexed by
+start date and team.
 """
 
+import csv
+import glob
+import hashlib
 import json
 import os
-import requests
+import pickle
 import shelve
-import pandas as pd
-from bs4 import BeautifulSoup
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import date
+from functools import lru_cache
 from zipfile import ZipFile
 
-people = pd.read_csv('people.csv', index_col=0, usecols=['identifier','key_cricinfo']).squeeze('columns')
-names = pd.read_csv('names.csv', index_col=0).squeeze('columns')
+cricinfo_url = 'https://www.espncricinfo.com'
+archive_name = 'tests_male_json.zip'
+catalog_name = 'match_catalog.pkl'
+
+_lock = nullcontext()
+_sources = {}
+_catalogs = {}
+_registries = {}
+
+
+@lru_cache(maxsize=None)
+def get_register(name):
+    """
+    Read a player register downloaded from cricsheet.org, caching it for later
+    calls.
+
+    Parameters
+    ----------
+    name : str
+        either 'people', for cricinfo keys, or 'names', for full names.
+
+    Returns
+    -------
+    pd.Series
+        register indexed by unique player identifier.
+
+    """
+    import pandas as pd
+
+    usecols = ['identifier', 'key_cricinfo'] if name == 'people' else None
+    return pd.read_csv(name + '.csv', index_col=0, usecols=usecols).squeeze('columns')
+
+
+def get_registry():
+    """
+    Get the registry for the working directory, building it on first use in
+    that directory.
+
+    Returns
+    -------
+    Registry
+        player registry.
+
+    """
+    path = os.getcwd()
+    if path not in _registries:
+        _registries[path] = Registry(path)
+
+    return _registries[path]
+
+
+def source_stamp():
+    """
+    Identify the files that matches are read from in the working directory.
+
+    Returns
+    -------
+    tuple
+        working directory, then the path and modification time of each
+        archive, or of README.txt if there is no archive.
+
+    """
+    if os.path.exists(archive_name):
+        paths = [archive_name, *sorted(glob.glob('recently_added_*.zip'), key=os.path.getmtime)]
+    else:
+        paths = [path for path in ['README.txt'] if os.path.exists(path)]
+
+    return (os.getcwd(), *((os.path.abspath(path), os.path.getmtime(path)) for path in paths))
+
+
+def get_source():
+    """
+    Get the source of matches for the working directory, opening it on first
+    use and again if its files have changed since. The cricsheet archive is
+    used if it has been downloaded, along with any archives of recently added
+    matches, else the folder of extracted matches.
+
+    Returns
+    -------
+    MatchArchive or MatchDirectory
+        source of matches.
+
+    """
+    stamp = source_stamp()
+    if stamp not in _sources:
+        if os.path.exists(archive_name):
+            _sources[stamp] = MatchArchive([path for path, _ in stamp[1:]])
+        else:
+            _sources[stamp] = MatchDirectory(stamp[0])
+
+    return _sources[stamp]
+
+
+def get_catalog():
+    """
+    Get the catalog of matches for the working directory. The catalog is
+    loaded from `catalog_name` if it was built from the same files, else it
+    is built again, reusing what it can of the stored catalog, and stored.
+
+    Returns
+    -------
+    MatchCatalog
+        catalog of matches.
+
+    """
+    stamp = source_stamp()
+    if stamp in _catalogs:
+        return _catalogs[stamp]
+
+    try:
+        with open(catalog_name, 'rb') as f:
+            catalog = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        catalog = None
+
+    if catalog is None or catalog.stamp != stamp:
+        catalog = MatchCatalog(get_source(), stamp, catalog)
+        with open(catalog_name + '.tmp', 'wb') as f:
+            pickle.dump(catalog, f)
+        os.replace(catalog_name + '.tmp', catalog_name)
+
+    _catalogs[stamp] = catalog
+
+    return catalog
+
+
+def __getattr__(name):
+    if name in ('people', 'names'):
+        return get_register(name)
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+class RateLimiter:
+    def __init__(self, rate=None):
+        """
+        Space out calls made from several threads.
+
+        Parameters
+        ----------
+        rate : float, optional
+            maximum number of calls per second. The default is None, for no
+            limit.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.interval = 1 / rate if rate else 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block until the next call is allowed.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+
+        time.sleep(start - now)
+
+
+class Registry:
+    def __init__(self, path=None, base_url=None):
+        """
+        Index the player registers downloaded from cricsheet.org by unique
+        identifier. Player information is cached for the rest of the process
+        and read through a single handle to the `cricinfo` shelve, which is
+        only reopened to store new players.
+
+        Parameters
+        ----------
+        path : str, optional
+            directory of the registers and the shelve. The default is None,
+            which uses the working directory.
+        base_url : str, optional
+            url that player pages are retrieved from. The default is None,
+            which uses `cricinfo_url`.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.path = os.getcwd() if path is None else path
+        self.base_url = base_url
+        self.cricinfo = {}
+        self.names = {}
+
+        with open(os.path.join(self.path, 'names.csv'), newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.names.setdefault(row['identifier'], []).append(row['name'])
+
+        with open(os.path.join(self.path, 'people.csv'), newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                names = self.names.setdefault(row['identifier'], [])
+                if row['name'] not in names:
+                    names.append(row['name'])
+                if row['key_cricinfo']:
+                    self.cricinfo[row['identifier']] = int(float(row['key_cricinfo']))
+
+        self._db = None
+        self._infos = {}
+
+    def full_name(self, identifier):
+        """
+        Get the first listed name of a player.
+
+        Parameters
+        ----------
+        identifier : str
+            unique identifier of player.
+
+        Returns
+        -------
+        str
+            player name.
+
+        """
+        return self.names[identifier][0]
+
+    def info(self, identifier, name=None):
+        """
+        Get the information of one player.
+
+        Parameters
+        ----------
+        identifier : str
+            unique identifier of player.
+        name : str, optional
+            player name, printed if the player is new. The default is None.
+
+        Returns
+        -------
+        dict
+            attributes of player's role and style.
+
+        """
+        return self.resolve({identifier: name})[identifier]
+
+    def resolve(self, players):
+        """
+        Get the information of many players at once, from the cache or the
+        shelve if they have been seen before, else from cricinfo. New players
+        are retrieved and stored under a single acquisition of the lock.
+
+        Parameters
+        ----------
+        players : dict
+            player name of each unique identifier.
+
+        Returns
+        -------
+        dict
+            attributes of each player's role and style, by identifier.
+
+        """
+        missing = [identifier for identifier in players if identifier not in self._infos]
+
+        if missing:
+            db = self._open()
+            if any(identifier not in db for identifier in missing):
+                with _lock:
+                    db = self._open(reopen=True)
+                    for identifier in missing:
+                        if identifier not in db:
+                            print('New Player:', players[identifier])
+                            db[identifier] = get_new_player_info(identifier, self.base_url)
+                    db.sync()
+
+            self._infos.update((identifier, db[identifier]) for identifier in missing)
+
+        return {identifier: self._infos[identifier] for identifier in players}
+
+    def prefetch(self, players, **kwargs):
+        """
+        Retrieve every new player from cricinfo concurrently with
+        `fetch_player_infos`, then store them all at once, so that later
+        lookups do not wait on the network.
+
+        Parameters
+        ----------
+        players : dict
+            player name of each unique identifier.
+        **kwargs
+            passed to `fetch_player_infos`.
+
+        Returns
+        -------
+        dict
+            error of each identifier that could not be retrieved.
+
+        """
+        db = self._open()
+        new = [identifier for identifier in players if identifier not in self._infos and identifier not in db]
+        if not new:
+            return {}
+
+        infos, errors = fetch_player_infos(new, self.base_url, **kwargs)
+
+        with _lock:
+            db = self._open(reopen=True)
+            for identifier, info in infos.items():
+                print('New Player:', players[identifier])
+                db[identifier] = info
+            db.sync()
+
+        self._infos.update(infos)
+
+        return errors
+
+    def close(self):
+        """
+        Close the handle to the shelve.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _open(self, reopen=False):
+        if reopen:
+            self.close()
+
+        if self._db is None:
+            self._db = shelve.open(os.path.join(self.path, 'cricinfo'))
+
+        return self._db
+
+
+def read_readme(lines):
+    """
+    Read the list of matches at the end of a cricsheet README.
+
+    Parameters
+    ----------
+    lines : list
+        lines of README, in which matches are listed newest first.
+
+    Returns
+    -------
+    list
+        date, description, identifier and teams of each match, oldest first.
+
+    """
+    matches = []
+    for line in reversed(lines):
+        try:
+            mat_date, *info, mat_idx, teams_str = line.split(' - ')
+        except ValueError:
+            break
+        matches.append((mat_date, info, mat_idx, teams_str.replace('\n', '').split(' vs ')))
+
+    return matches
+
+
+class MatchDirectory:
+    def __init__(self, path):
+        """
+        Read matches extracted into the `tests_json` folder, listed in
+        README.txt.
+
+        Parameters
+        ----------
+        path : str
+            folder containing README.txt and `tests_json`.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.path = path
+        self.matches = []
+
+        if os.path.exists(os.path.join(path, 'README.txt')):
+            with open(os.path.join(path, 'README.txt')) as f:
+                self.matches = read_readme(f.readlines())
+
+    def open(self, fname):
+        """
+        Open a match file.
+
+        Parameters
+        ----------
+        fname : str
+            filename of match.
+
+        Returns
+        -------
+        file
+            binary file.
+
+        """
+        return open(os.path.join(self.path, 'tests_json', fname), 'rb')
+
+    def __contains__(self, fname):
+        return os.path.exists(os.path.join(self.path, 'tests_json', fname))
+
+
+class MatchArchive:
+    def __init__(self, paths):
+        """
+        Read matches straight from cricsheet zip archives, without extracting
+        them. The central directory of each archive is indexed once, and
+        matches in later archives, such as those of recently added matches,
+        replace the same matches in earlier ones. Archives are opened again
+        in each process that reads from them.
+
+        Parameters
+        ----------
+        paths : list
+            paths of archives, oldest first.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.paths = paths
+        self.members = {}
+        self.matches = []
+        self._zips = {}
+        self._pid = None
+
+        seen = set()
+        for path in reversed(paths):
+            with ZipFile(path) as z:
+                names = z.namelist()
+                for name in names:
+                    if name.endswith('.json'):
+                        self.members.setdefault(os.path.basename(name), (path, name))
+
+                if 'README.txt' in names:
+                    lines = z.read('README.txt').decode('utf-8').splitlines(keepends=True)
+                    self.matches[:0] = [match for match in read_readme(lines) if match[2] not in seen]
+                    seen.update(match[2] for match in self.matches)
+
+    def open(self, fname):
+        """
+        Open a match member of its archive.
+
+        Parameters
+        ----------
+        fname : str
+            filename of match.
+
+        Returns
+        -------
+        file
+            binary file, streamed from the archive.
+
+        """
+        try:
+            path, name = self.members[fname]
+        except KeyError:
+            raise FileNotFoundError(fname) from None
+
+        if self._pid != os.getpid():
+            self._zips, self._pid = {}, os.getpid()
+
+        if path not in self._zips:
+            self._zips[path] = ZipFile(path)
+
+        return self._zips[path].open(name)
+
+    def __contains__(self, fname):
+        return fname in self.members
+
+    def __getstate__(self):
+        return {**self.__dict__, '_zips': {}, '_pid': None}
+
+
+class MatchCatalog:
+    def __init__(self, source, stamp=None, previous=None):
+        """
+        Index the matches of a source in typed columns, sorted by start date,
+        with the rows of each team, so that matches can be selected by date
+        range with a binary search and by team with a lookup. Dates, formats
+        and teams are read from the README, and venues and events from the
+        info block of each match.
+
+        Parameters
+        ----------
+        source : MatchArchive or MatchDirectory
+            source of matches.
+        stamp : tuple, optional
+            files the source was read from, from `source_stamp`. The default
+            is None.
+        previous : MatchCatalog, optional
+            earlier catalog, whose venues and events are reused for matches
+            it already holds. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.stamp = stamp
+        matches = sorted(source.matches, key=lambda match: match[0])
+
+        self.ids = np.array([int(match[2]) for match in matches], np.int64)
+        self.dates = np.array([match[0] for match in matches], 'datetime64[D]')
+        described = [(*match[1], '', '', '')[:3] for match in matches]
+        self.team_types, self.match_types, self.genders = (np.array([d[i] for d in described], object) for i in range(3))
+
+        self.teams = sorted({team for match in matches for team in match[3]})
+        self.codes = {team: code for code, team in enumerate(self.teams)}
+        self.team_codes = np.array([[self.codes[team] for team in match[3][:2]] for match in matches], np.int16)
+        self.team_codes = self.team_codes.reshape(len(matches), 2)
+        self.rows = {team: np.flatnonzero((self.team_codes == code).any(axis=1)) for team, code in self.codes.items()}
+
+        details = {} if previous is None else dict(zip(previous.ids.tolist(), zip(previous.venues, previous.events)))
+        for match_id in self.ids.tolist():
+            if match_id not in details:
+                try:
+                    with source.open('{}.json'.format(match_id)) as f:
+                        info = json.load(f)['info']
+                    details[match_id] = info.get('venue', ''), info.get('event', {}).get('name', '')
+                except (OSError, ValueError, KeyError):
+                    details[match_id] = '', ''
+
+        self.venues = np.array([details[match_id][0] for match_id in self.ids.tolist()], object)
+        self.events = np.array([details[match_id][1] for match_id in self.ids.tolist()], object)
+
+    def query(self, start_date=None, end_date=None, teams=None, all_teams=None, match_type='Test'):
+        """
+        Select matches.
+
+        Parameters
+        ----------
+        start_date : str, optional
+            Lower bound for start of a match. The default is None.
+        end_date : str, optional
+            Upper bound for start of a match. The default is None.
+        teams : list, optional
+            teams that must all play in the match. The default is None.
+        all_teams : iterable, optional
+            whitelisted teams that both teams must be in. The default is None.
+        match_type : str, optional
+            format of match, or None for any. The default is 'Test'.
+
+        Returns
+        -------
+        np.array
+            rows of selected matches, in order of start date.
+
+        """
+        start = 0 if start_date is None else np.searchsorted(self.dates, np.datetime64(start_date, 'D'), 'left')
+        end = len(self.ids) if end_date is None else np.searchsorted(self.dates, np.datetime64(end_date, 'D'),
+                                                                    'right')
+
+        if teams:
+            rows = self.rows.get(teams[0], np.zeros(0, int))
+            for team in teams[1:]:
+                rows = np.intersect1d(rows, self.rows.get(team, np.zeros(0, int)), assume_unique=True)
+            rows = rows[np.searchsorted(rows, start):np.searchsorted(rows, end)]
+        else:
+            rows = np.arange(start, end)
+
+        if all_teams is not None:
+            codes = [self.codes[team] for team in all_teams if team in self.codes]
+            rows = rows[np.isin(self.team_codes[rows], codes).all(axis=1)]
+
+        if match_type is not None:
+            rows = rows[self.match_types[rows] == match_type]
+
+        return rows
+
+    def filenames(self, rows):
+        """
+        Get the filenames of matches.
+
+        Parameters
+        ----------
+        rows : np.array
+            rows of matches.
+
+        Returns
+        -------
+        list
+            filename of each match.
+
+        """
+        return ['{}.json'.format(match_id) for match_id in self.ids[rows].tolist()]
+
+    def __len__(self):
+        return len(self.ids)
 
 
 def download(url, file):
@@ -36,6 +655,8 @@ def download(url, file):
     None.
 
     """
+    import requests
+
     with open(file, 'wb') as f:
         f.write(requests.get(url).content)
 
@@ -43,7 +664,8 @@ def download(url, file):
 def download_data():
     """
     Download most recent versions of test match and individual data stored from
-    cricsheet.org.
+    cricsheet.org. The archive of matches is kept as it is and read without
+    extracting it.
 
     Returns
     -------
@@ -53,18 +675,35 @@ def download_data():
     for csv_name in ('people.csv', 'names.csv'):
         download('https://cricsheet.org/register/' + csv_name, csv_name)
 
-    download('https://cricsheet.org/downloads/tests_male_json.zip', 'temp.zip')
+    download('https://cricsheet.org/downloads/' + archive_name, archive_name)
+
+    for path in glob.glob('recently_added_*.zip'):
+        os.remove(path)
+
+
+def download_recent(days=7):
+    """
+    Download the archive of matches recently added to cricsheet.org, which is
+    read on top of the full archive.
+
+    Parameters
+    ----------
+    days : int, optional
+        number of days covered, one of 2, 7 or 30. The default is 7.
+
+    Returns
+    -------
+    None.
 
-    with ZipFile('temp.zip', 'r') as z:
-        fnames = z.namelist()
-        z.extract(fnames.pop(fnames.index('README.txt')))
-        z.extractall('tests_json', fnames)
+    """
+    fname = 'recently_added_{}_male_json.zip'.format(days)
+    download('https://cricsheet.org/downloads/' + fname, fname)
 
 
-def get_filenames(all_teams=None, start_date=None, end_date=None):
+def get_filenames(all_teams=None, start_date=None, end_date=None, teams=None):
     """
     Select matches only if they fall in a specified timeframe or if they are
-    played between two whitelisted teams.
+    played between two whitelisted teams, using the match catalog.
 
     Parameters
     ----------
@@ -74,6 +713,9 @@ def get_filenames(all_teams=None, start_date=None, end_date=None):
         Lower bound for start of a match. The default is None.
     end_date : str, optional
         Upper bound for start of a match. The default is None.
+    teams : list, optional
+        teams that must all play in the match, such as ['England', 'India'].
+        The default is None.
 
     Yields
     ------
@@ -91,14 +733,27 @@ def get_filenames(all_teams=None, start_date=None, end_date=None):
         all_teams = {'Australia', 'Bangladesh', 'England', 'India', 'New Zealand', 'Pakistan', 'Sri Lanka',
                      'South Africa', 'West Indies'}
 
-    for line in reversed(open('README.txt').readlines()):
-        try:
-            mat_date, *_, mat_idx, teams_str = line.split(' - ')
-            teams = teams_str.replace('\n', '').split(' vs ')
-            if start_date <= mat_date <= end_date and (all_teams is None or set(teams).issubset(all_teams)):
-                yield mat_idx + '.json'
-        except ValueError:
-            break
+    catalog = get_catalog()
+    yield from catalog.filenames(catalog.query(start_date, end_date, teams, all_teams))
+
+
+def set_lock(lock):
+    """
+    Set the lock that guards the stored player information, so that several
+    processes can look up players at once.
+
+    Parameters
+    ----------
+    lock : multiprocessing.Lock
+        lock shared between processes.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _lock
+    _lock = lock
 
 
 def load_match(fname):
@@ -116,18 +771,60 @@ def load_match(fname):
         dictionary format of .json file.
 
     """
-    return json.load(open(os.path.join(os.getcwd(), 'tests_json', fname)))
+    with get_source().open(fname) as f:
+        return json.load(f)
 
 
-def get_new_player_info(identifier):
+def match_hash(fname):
     """
-    Load new player information from cricinfo, if `identifier` has not been
-    seen before.
+    Hash the contents of a match file, to detect when it has changed.
+
+    Parameters
+    ----------
+    fname : str
+        filename of match.
+
+    Returns
+    -------
+    str
+        SHA-1 hex digest of file.
+
+    """
+    with get_source().open(fname) as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def player_url(identifier, base_url=None):
+    """
+    Get the url of a player's page on cricinfo.
 
     Parameters
     ----------
     identifier : str
         unique identifer of player.
+    base_url : str, optional
+        url of cricinfo. The default is None, which uses `cricinfo_url`.
+
+    Returns
+    -------
+    str
+        url of player page.
+
+    """
+    registry = get_registry()
+    full_name, key = registry.full_name(identifier), registry.cricinfo[identifier]
+
+    return (base_url or cricinfo_url) + '/player/' + full_name.replace(' ', '-') + '-' + str(key)
+
+
+def parse_player_info(html):
+    """
+    Read player information from a player page.
+
+    Parameters
+    ----------
+    html : str
+        player page.
 
     Returns
     -------
@@ -135,10 +832,9 @@ def get_new_player_info(identifier):
         attributes of players's role and style.
 
     """
-    full_name = names[names.index == identifier][0]
-    key = int(people[people.index == identifier][0])
-    url = 'https://www.espncricinfo.com/player/' + full_name.replace(' ', '-') + '-' + str(key)
-    soup = BeautifulSoup(requests.get(url).text, 'html.parser')
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
     root = (soup.body.div.section.section.find('div', class_='ds-relative', recursive=False).div
             .find('div', class_='ds-flex ds-space-x-5').find('div', class_='ds-grow', recursive=False)
             .find('div', class_='ds-p-4').div.div)
@@ -146,10 +842,100 @@ def get_new_player_info(identifier):
     return dict((t.text for t in tag.contents) for tag in root.contents)
 
 
+def get_new_player_info(identifier, base_url=None, session=None):
+    """
+    Load new player information from cricinfo, if `identifier` has not been
+    seen before.
+
+    Parameters
+    ----------
+    identifier : str
+        unique identifer of player.
+    base_url : str, optional
+        url of cricinfo. The default is None, which uses `cricinfo_url`.
+    session : requests.Session, optional
+        session to reuse connections from. The default is None.
+
+    Returns
+    -------
+    dict
+        attributes of players's role and style.
+
+    """
+    import requests
+
+    response = (session or requests).get(player_url(identifier, base_url), timeout=30)
+    response.raise_for_status()
+
+    return parse_player_info(response.text)
+
+
+def fetch_player_infos(identifiers, base_url=None, workers=8, rate=4, retries=3, backoff=1):
+    """
+    Retrieve the information of many new players from cricinfo concurrently.
+    At most `workers` requests are made at once and at most `rate` are
+    started each second across all of them. Requests that fail are retried
+    after waiting `backoff` seconds, doubling with each attempt.
+
+    Parameters
+    ----------
+    identifiers : list
+        unique identifiers of players.
+    base_url : str, optional
+        url of cricinfo. The default is None, which uses `cricinfo_url`.
+    workers : int, optional
+        number of threads. The default is 8.
+    rate : float, optional
+        maximum number of requests per second, or None for no limit. The
+        default is 4.
+    retries : int, optional
+        number of retries for each player. The default is 3.
+    backoff : float, optional
+        seconds to wait before the first retry. The default is 1.
+
+    Returns
+    -------
+    dict
+        attributes of each player's role and style, by identifier.
+    dict
+        error of each identifier that could not be retrieved.
+
+    """
+    import requests
+
+    limiter = RateLimiter(rate)
+    local = threading.local()
+
+    def fetch(identifier):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+
+        for attempt in range(retries + 1):
+            limiter.wait()
+            try:
+                return get_new_player_info(identifier, base_url, local.session)
+            except requests.RequestException:
+                if attempt == retries:
+                    raise
+                time.sleep(backoff * 2 ** attempt)
+
+    infos, errors = {}, {}
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {identifier: pool.submit(fetch, identifier) for identifier in identifiers}
+        for identifier, future in futures.items():
+            try:
+                infos[identifier] = future.result()
+            except Exception as error:
+                errors[identifier] = error
+
+    return infos, errors
+
+
 def get_player_info(name, identifier):
     """
     Load player information from stored shelved if `identifier` has been seen
-    before, else retreive this information from cricinfo.
+    before, else retreive this information from cricinfo. Information is
+    cached for the rest of the process by the registry.
 
     Parameters
     ----------
@@ -164,12 +950,7 @@ def get_player_info(name, identifier):
         attribute of player's role and style.
 
     """
-    db = shelve.open('cricinfo')
-    if identifier not in db:
-        print('New Player:', name)
-        db[identifier] = get_new_player_info(identifier)
-
-    return db[identifier]
+    return get_registry().info(identifier, name)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,507 @@
+"""
+This module stores the deliveries of an inning as a columnar event log. Each
+delivery is a row of small integer codes in a NumPy structured array, and
+players are stored as codes into lists of names kept alongside, so that cards,
+falls of wickets and partnerships can be computed with grouped array
+operations and many innings can be held in memory at once. The outcome of a
+single delivery is likewise held as a tuple of small integer codes.
+"""
+
+import numpy as np
+from collections import namedtuple
+
+from tables import extras_types
+
+kinds = ['bowled', 'caught', 'caught behind', 'caught and bowled', 'lbw', 'stumped', 'hit wicket', 'run out',
+         'obstructing the field', 'handled the ball', 'hit the ball twice', 'timed out',
+         'retired hurt', 'retired out', 'retired not out']
+players = {'striker': 'batters', 'non_striker': 'batters', 'player_out': 'batters', 'bowler': 'bowlers',
+           'fielder': 'fielders'}
+extras_codes = {k: i + 1 for i, k in enumerate(extras_types)}
+
+
+class Outcome(namedtuple('Outcome', ['runs', 'extras_type', 'extras', 'wicket'])):
+    """
+    Outcome of a delivery as small integers: the runs scored by the batter,
+    the extras type as one plus its index in `extras_types` with zero for
+    none, the runs scored as extras, and the wicket as 1 for a wicket credited
+    to the bowler, 2 for a run out and zero for none.
+
+    The string form, such as 'W', '1+W', '2nb', '1wd' or '4', is only built
+    for display and parsed when comparing against older values.
+
+    """
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Encode a value in the notation used by `Ball`.
+
+        Parameters
+        ----------
+        value : int or str
+            runs, or a description such as 'W', '1+W', '2nb', '1wd' or '4'.
+
+        Returns
+        -------
+        Outcome
+            encoded outcome.
+
+        """
+        if not isinstance(value, str):
+            return cls(int(value), 0, 0, 0)
+        elif value == 'W':
+            return cls(0, 0, 0, 1)
+        elif value.endswith('+W'):
+            return cls(int(value[:-2]), 0, 0, 2)
+
+        runs = value.rstrip('nbwdl')
+        kind = value[len(runs):]
+        if not kind:
+            return cls(int(runs), 0, 0, 0)
+        elif kind == 'nb':
+            return cls(int(runs), extras_codes[kind], 1, 0)
+        else:
+            return cls(0, extras_codes[kind], int(runs) + (kind == 'wd'), 0)
+
+    @property
+    def total(self):
+        """Runs scored off the delivery."""
+        return self.runs + self.extras
+
+    @property
+    def legal(self):
+        """Whether the delivery counts as a ball of the over."""
+        return self.extras_type != extras_codes['nb'] and self.extras_type != extras_codes['wd']
+
+    @property
+    def ran(self):
+        """Runs scored off the delivery, less the penalty of a no ball or wide."""
+        return self.total - (not self.legal)
+
+    @property
+    def kind(self):
+        """Extras type as one of `extras_types`, or '' for none."""
+        return extras_types[self.extras_type - 1] if self.extras_type else ''
+
+    def __str__(self):
+        if self.wicket == 1:
+            return 'W'
+        elif self.wicket:
+            return '{}+W'.format(self.runs)
+        elif self.extras_type:
+            return '{}{}'.format(self.runs if self.kind == 'nb' else self.ran, self.kind)
+        else:
+            return str(self.runs)
+
+
+class EventLog:
+    dtype = np.dtype([('inning', 'i1'), ('over', 'i2'), ('ball', 'i1'), ('striker', 'i1'), ('non_striker', 'i1'),
+                      ('bowler', 'i1'), ('runs', 'i2'), ('extras', 'i2'), ('extras_type', 'i1'),
+                      ('non_boundary', '?'), ('wicket', 'i1'), ('player_out', 'i1'), ('fielder', 'i1')])
+    version = 0
+
+    def __init__(self, inning=0, size=256):
+        """
+        Initialise an empty event log.
+
+        Extras types are stored as one plus their index in `extras_types` and
+        wicket kinds as one plus their index in `kinds`, with zero for none.
+        Players are stored as indices into `names`, with -1 for none.
+        `version` is incremented whenever a delivery, wicket or name is
+        added, so that views computed from the log can be cached against it.
+        Falls of wickets and partnerships are indexed as deliveries are
+        added, so that they can be read without scanning the deliveries.
+
+        Parameters
+        ----------
+        inning : int, optional
+            inning index. The default is 0.
+        size : int, optional
+            initial number of rows allocated. The default is 256.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.inning = inning
+        self.names = {key: [] for key in ('batters', 'bowlers', 'fielders')}
+        self.penalty = [0, 0]
+        self.declared = False
+
+        self._codes = {key: {} for key in self.names}
+        self._data = np.zeros(size, self.dtype)
+        self._len = 0
+        self._total = 0
+        self._falls = []
+        self._pships = []
+
+    @classmethod
+    def concat(cls, logs):
+        """
+        Join the event logs of several innings into one log, such as for a
+        match. Player codes are mapped onto the names of the joined log.
+        Penalty runs and declarations stay with the logs of each inning.
+
+        Parameters
+        ----------
+        logs : list
+            event logs.
+
+        Returns
+        -------
+        EventLog
+            joined event log.
+
+        """
+        new = cls(size=max(1, sum(map(len, logs))))
+
+        for log in logs:
+            data = log[:].copy()
+            for column, key in players.items():
+                codes = np.array([new.code(key, name) for name in log.names[key]] + [-1], int)
+                data[column] = codes[data[column]]
+
+            new._data[len(new):len(new) + len(log)] = data
+            new._len += len(log)
+
+        new._reindex()
+
+        return new
+
+    def code(self, key, name):
+        """
+        Get the code of a player, adding them to `names` if unseen.
+
+        Parameters
+        ----------
+        key : str
+            one of 'batters', 'bowlers' or 'fielders'.
+        name : str
+            player name.
+
+        Returns
+        -------
+        int
+            player code.
+
+        """
+        try:
+            return self._codes[key][name]
+        except KeyError:
+            self._codes[key][name] = code = len(self.names[key])
+            self.names[key].append(name)
+            self.version += 1
+            return code
+
+    def append(self, over, ball, striker, non_striker, bowler, runs, extras, extras_type, non_boundary=False):
+        """
+        Add a delivery to the log.
+
+        Parameters
+        ----------
+        over : int
+            over index.
+        ball : int
+            legal ball of the over the delivery counts towards, from one.
+        striker : int
+            code of batter on strike.
+        non_striker : int
+            code of batter off strike.
+        bowler : int
+            code of bowler.
+        runs : int
+            runs scored by the batter.
+        extras : int
+            runs scored as extras.
+        extras_type : str
+            one of `extras_types`, or '' for none.
+        non_boundary : bool, optional
+            whether four or six runs were run rather than a boundary. The
+            default is False.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self._len == len(self._data):
+            self._data = np.resize(self._data, 2 * len(self._data))
+
+        code = extras_types.index(extras_type) + 1 if extras_type else 0
+        self._data[self._len] = (self.inning, over, ball, striker, non_striker, bowler, runs, extras, code,
+                                 non_boundary, 0, -1, -1)
+        self._len += 1
+        self.version += 1
+
+        pair = [min(striker, non_striker), max(striker, non_striker)]
+        if not self._pships or self._pships[-1][:2] != pair:
+            self._pships.append(pair + [0] * 7)
+
+        faced = extras_type != 'wd'
+        pship = self._pships[-1]
+        pship[2 if striker == pair[0] else 4] += runs
+        pship[3 if striker == pair[0] else 5] += faced
+        pship[6] += runs + extras
+        pship[7] += faced
+        pship[8] = 0
+        self._total += runs + extras
+
+    def dismiss(self, batter, kind, fielder=None):
+        """
+        Record a wicket on the last delivery. Only the first wicket of a
+        delivery is kept.
+
+        Parameters
+        ----------
+        batter : int
+            code of dismissed batter.
+        kind : str
+            one of `kinds`.
+        fielder : str, optional
+            name of first fielder involved. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        i = self._len - 1
+        if not self._data['wicket'][i]:
+            self._data['wicket'][i] = kinds.index(kind) + 1
+            self._data['player_out'][i] = batter
+            self._data['fielder'][i] = -1 if fielder is None else self.code('fielders', str(fielder))
+            self.version += 1
+
+            if 'retired' not in kind:
+                self._falls.append((i, self._total, batter, int(self._data['over'][i]), int(self._data['ball'][i])))
+                self._pships[-1][8] = 1
+
+    def values(self):
+        """
+        Describe each delivery in the notation used by `Ball`, such as 'W',
+        '1+W', '2nb', '1wd' or '4'.
+
+        Returns
+        -------
+        list
+            description of each delivery.
+
+        """
+        values = []
+        for runs, extras, code, wicket in self[['runs', 'extras', 'extras_type', 'wicket']].tolist():
+            if wicket:
+                values.append('{}+W'.format(runs) if kinds[wicket - 1] == 'run out'
+                              else str(runs) if 'retired' in kinds[wicket - 1] else 'W')
+            elif code == 2:
+                values.append('{}wd'.format(runs + extras - 1))
+            elif code:
+                values.append('{}{}'.format(runs if code == 1 else runs + extras, extras_types[code - 1]))
+            else:
+                values.append(str(runs))
+
+        return values
+
+    def legal(self):
+        """
+        Whether each delivery counts as a ball of the over.
+
+        Returns
+        -------
+        np.array
+            True for every delivery other than no balls and wides.
+
+        """
+        return ~np.isin(self['extras_type'], [extras_types.index(k) + 1 for k in ('nb', 'wd')])
+
+    def faced(self):
+        """
+        Whether each delivery counts as a ball faced by the striker.
+
+        Returns
+        -------
+        np.array
+            True for every delivery other than wides.
+
+        """
+        return self['extras_type'] != extras_types.index('wd') + 1
+
+    def wickets(self):
+        """
+        Whether each delivery ends with a wicket that counts towards the team
+        score, which excludes retirements.
+
+        Returns
+        -------
+        np.array
+            True for deliveries with a wicket.
+
+        """
+        return (self['wicket'] > 0) & (self['wicket'] < kinds.index('retired hurt') + 1)
+
+    def scores(self):
+        """
+        Score of the team after each delivery, including penalty runs awarded
+        before the inning.
+
+        Returns
+        -------
+        np.array
+            runs.
+        np.array
+            wickets.
+
+        """
+        return self.penalty[0] + np.cumsum(self['runs'] + self['extras']), np.cumsum(self.wickets())
+
+    def falls(self):
+        """
+        State of the inning at each fall of wicket, read from the index kept
+        as deliveries are added.
+
+        Returns
+        -------
+        list
+            for each wicket, the row of the delivery, the team score and
+            number of wickets after it, the code of the dismissed batter, and
+            the over and ball of the delivery.
+
+        """
+        return [self.fall(k) for k in range(len(self._falls))]
+
+    def fall(self, k):
+        """
+        State of the inning at a single fall of wicket.
+
+        Parameters
+        ----------
+        k : int
+            index of wicket, from zero. Negative indices count from the last
+            wicket.
+
+        Returns
+        -------
+        tuple
+            row of the delivery, team score and number of wickets after it,
+            code of the dismissed batter, and over and ball of the delivery.
+
+        """
+        row, runs, out, over, ball = self._falls[k]
+
+        return row, self.penalty[0] + runs, k % len(self._falls) + 1, out, over, ball
+
+    def batting(self):
+        """
+        Sum the batting figures of each batter.
+
+        Returns
+        -------
+        np.array
+            runs, balls, fours and sixes of each batter, in the order of
+            `names['batters']`.
+
+        """
+        striker, runs = self['striker'], self['runs']
+        boundary = ~self['non_boundary']
+
+        return np.array([np.bincount(striker, weights, len(self.names['batters']))
+                         for weights in (runs, self.faced(), (runs == 4) & boundary, (runs == 6) & boundary)],
+                        int).T
+
+    def bowling(self):
+        """
+        Sum the bowling figures of each bowler. Byes and leg byes are not
+        charged to the bowler, and a maiden is a complete over from a single
+        bowler without any runs charged.
+
+        Returns
+        -------
+        np.array
+            balls, maidens, runs, wickets and extras of each bowler, in the
+            order of `names['bowlers']`.
+
+        """
+        bowler, total, code = self['bowler'], self['runs'] + self['extras'], self['extras_type']
+        legal = self.legal()
+        charged = np.where(np.isin(code, [extras_types.index(k) + 1 for k in ('lb', 'b')]), 0, total)
+        extras = np.where(code == extras_types.index('nb') + 1, 1, np.where(code == extras_types.index('wd') + 1,
+                                                                             total, 0))
+        wickets = self.wickets() & (self['wicket'] != kinds.index('run out') + 1)
+        size = len(self.names['bowlers'])
+
+        maidens = np.zeros(size, int)
+        if len(self):
+            starts = np.flatnonzero(np.diff(self['over'], prepend=-1))
+            maiden = ((np.add.reduceat(legal, starts) == 6) & (np.add.reduceat(charged, starts) == 0)
+                      & (np.maximum.reduceat(bowler, starts) == np.minimum.reduceat(bowler, starts)))
+            maidens = np.bincount(bowler[starts][maiden], minlength=size)
+
+        return np.array([np.bincount(bowler, legal, size), maidens, np.bincount(bowler, charged, size),
+                         np.bincount(bowler, wickets, size), np.bincount(bowler, extras, size)], int).T
+
+    def partnerships(self):
+        """
+        Figures of each partnership, where a partnership is a run of
+        deliveries with the same pair of batters at the crease, read from the
+        index kept as deliveries are added.
+
+        Returns
+        -------
+        np.array
+            for each partnership, the codes of the earlier and later batter,
+            their runs and balls, the runs and balls of the partnership, and
+            whether it ended with a wicket.
+
+        """
+        return np.array(self._pships, int).reshape(-1, 9)
+
+    def _reindex(self):
+        runs, _ = self.scores()
+        rows = np.flatnonzero(self.wickets())
+        columns = [self[key][rows].tolist() for key in ('player_out', 'over', 'ball')]
+
+        self._total = int(runs[-1]) - self.penalty[0] if len(self) else 0
+        self._falls = [(i, int(runs[i]) - self.penalty[0], *values) for i, *values in zip(rows.tolist(), *columns)]
+        self._pships = self._partnerships().tolist()
+
+    def _partnerships(self):
+        """
+        Sum the figures of each partnership by scanning the deliveries.
+
+        Returns
+        -------
+        np.array
+            for each partnership, the codes of the earlier and later batter,
+            their runs and balls, the runs and balls of the partnership, and
+            whether it ended with a wicket.
+
+        """
+        if not len(self):
+            return np.zeros((0, 9), int)
+
+        striker, runs, faced = self['striker'], self['runs'], self.faced()
+        pairs = np.sort(np.stack([striker, self['non_striker']]), axis=0)
+        starts = np.flatnonzero(np.any(np.diff(pairs, prepend=-1), axis=0))
+        ends = np.r_[starts[1:], len(self)] - 1
+
+        figures = [pairs[0, starts], pairs[1, starts]]
+        for batter in pairs:
+            on_strike = striker == batter
+            figures.extend([np.add.reduceat(runs * on_strike, starts), np.add.reduceat(faced & on_strike, starts)])
+        figures.extend([np.add.reduceat(self['runs'] + self['extras'], starts), np.add.reduceat(faced, starts),
+                        self.wickets()[ends]])
+
+        return np.array(figures, int).T
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_falls' not in state:
+            self._reindex()
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        return self._data[:self._len][key]
@@ -11,37 +11,136 @@ class Float(float):
             return float('inf') if self else float()
 
 
+class Sampler:
+    def __init__(self, values, weights):
+        pairs = [(value, float(weight)) for value, weight in zip(values, weights) if weight > 0]
+        self.values = [value for value, _ in pairs]
+        self.prob = [1.0] * len(pairs)
+        self.alias = list(range(len(pairs)))
+
+        total = sum(weight for _, weight in pairs)
+        scaled = [weight * len(pairs) / total for _, weight in pairs]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            i, j = small.pop(), large.pop()
+            self.prob[i], self.alias[i] = scaled[i], j
+            scaled[j] += scaled[i] - 1
+            (small if scaled[j] < 1 else large).append(j)
+
+        values = np.fromiter(self.values, object, len(self.values))
+        self.arrays = values, np.array(self.prob), np.array(self.alias, int)
+
+    @classmethod
+    def from_dict(cls, d):
+        items = [(k, v) for k, v in d.items() if k != 'total']
+        return cls([k for k, _ in items], [v for _, v in items])
+
+    def draw(self, rng=rd):
+        u = rng.random() * len(self.values)
+        i = int(u)
+        return self.values[i if u - i < self.prob[i] else self.alias[i]]
+
+    def draws(self, rng, size):
+        values, prob, alias = self.arrays
+        u = rng.random(size) * len(values)
+        i = u.astype(int)
+        return values[np.where(u - i < prob[i], i, alias[i])]
+
+    def __len__(self):
+        return len(self.values)
+
+
 class List(list):
+    _positions = None
+
     def __getitem__(self, index):
-        try:
+        if isinstance(index, slice) or hasattr(index, '__index__'):
             return super().__getitem__(index)
-        except TypeError:
-            return super().__getitem__(super().index(index))
+        return super().__getitem__(self.index(index))
 
-    def copy(self):
-        return self.__class__(super().copy())
+    def __contains__(self, value):
+        return _key(value) in self._index()
 
-    def remove(self, value):
+    def index(self, value, *args):
+        if args:
+            return super().index(value, *args)
         try:
-            super().remove(value)
-        except ValueError:
-            pass
+            return self._index()[_key(value)]
+        except KeyError:
+            raise ValueError('{!r} is not in list'.format(value)) from None
 
     def get(self, index, default=None):
-        try:
-            return self.__getitem__(index)
-        except ValueError:
-            return default
+        position = self._index().get(_key(index))
+        return default if position is None else super().__getitem__(position)
+
+    def copy(self):
+        new = self.__class__(self)
+        new._positions = None if self._positions is None else self._positions.copy()
+        return new
+
+    def append(self, value):
+        super().append(value)
+        if self._positions is not None:
+            self._positions.setdefault(_key(value), len(self) - 1)
+
+    def remove(self, value):
+        del self[self.index(value)]
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._positions = None
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._positions = None
+
+    def __iadd__(self, other):
+        self._positions = None
+        return super().__iadd__(other)
+
+    def extend(self, values):
+        super().extend(values)
+        self._positions = None
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._positions = None
+
+    def pop(self, index=-1):
+        self._positions = None
+        return super().pop(index)
+
+    def clear(self):
+        super().clear()
+        self._positions = None
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._positions = None
+
+    def reverse(self):
+        super().reverse()
+        self._positions = None
+
+    def _index(self):
+        if self._positions is None:
+            self._positions = {}
+            for i, value in enumerate(super().__iter__()):
+                self._positions.setdefault(_key(value), i)
+        return self._positions
+
+
+def _key(value):
+    return getattr(value, 'name', value)
 
 
 def attrlister(objs, *attrs):
     return [attrgetter(*attrs)(obj) for obj in objs]
 
 
-def rvg(d):
-    d = d.copy()
-    d.pop('total', None)
-    return rd.choices(*zip(*d.items()))[0]
+def rvg(d, rng=rd):
+    return Sampler.from_dict(d).draw(rng)
 
 
 def total_dicts(d):
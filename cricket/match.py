@@ -1,28 +1,26 @@
-import os
-import shelve
 import pandas as pd
 import random as rd
 
-from functions import rvg
+from tables import FreqStore
 from classes import MatchMethods
 from inning import Inning
 
 
 class Match(MatchMethods):
-    def __init__(self, index, teams, pdb):
+    def __init__(self, index, teams, pdb, rng=None):
         super().__init__(index, teams, pdb)
-        self.toss = {'decision': rvg(shelve.open(os.getcwd() + '\data\\real_freqs', 'r')['toss']),
-                     'winner': rd.choice(self.teams)}
+        self.rng = rd.Random() if rng is None else rng
+
+        store = FreqStore.get()
+        self.tables = store.tables
+        self.toss = {'decision': store.toss.draw(self.rng), 'winner': self.rng.choice(self.teams)}
 
         self.follow_on = False
+        self.clock = Clock()
 
     @property
     def sessions(self):
-        overs = sum(map(abs, self))
-        days, overs = divmod(overs, 90)
-        sessions, overs = divmod(overs, 30)
-
-        return days, sessions, overs
+        return self.clock.day, self.clock.session, self.clock.over
 
     @property
     def outcome(self):
@@ -55,7 +53,7 @@ class Match(MatchMethods):
                 break
 
     def rewind(self, pdb, index=(None,)*3, run=False):
-        new = self.__class__(self.index, self.teams, pdb)
+        new = self.__class__(self.index, self.teams, pdb, self.rng)
         new.toss = self.toss
 
         for inn in self[:index[0]]:
@@ -76,7 +74,7 @@ class Match(MatchMethods):
                 if old is not None:
                     self.follow_on = old.follow_on
                 elif lead > 200:
-                    self.follow_on = True if lead > 300 or self.sessions[0] >= 3 else bool(rd.randint(0, 1))
+                    self.follow_on = True if lead > 300 or self.sessions[0] >= 3 else bool(self.rng.randint(0, 1))
             elif len(self) == 3:
                 self.target = self[2].score[0] + lead * (-1 if self.follow_on else 1) + 1
                 if self.target <= 0:
@@ -89,6 +87,26 @@ class Match(MatchMethods):
             self.innings.append(default.rewind(index, self, run))
 
 
+class Clock:
+    def __init__(self, overs_per_session=30, sessions_per_day=3):
+        self.overs_per_session = overs_per_session
+        self.sessions_per_day = sessions_per_day
+        self.overs = self.day = self.session = self.over = 0
+
+    def tick(self):
+        self.overs += 1
+        self.over += 1
+        if self.over == self.overs_per_session:
+            self.over = 0
+            self.session += 1
+            if self.session == self.sessions_per_day:
+                self.session = 0
+                self.day += 1
+
+    def __repr__(self):
+        return type(self).__name__ + '(day {}, session {}, over {})'.format(self.day + 1, self.session + 1, self.over)
+
+
 if __name__ == '__main__':
     import squads
 
@@ -0,0 +1,111 @@
+"""
+This module runs many simulations of a match across a pool of processes. Every
+simulation draws from its own random number generator, seeded from a single
+master seed and the index of the simulation, so results do not depend on how
+simulations are shared between processes or the order in which they finish.
+"""
+
+import random as rd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from match import Match
+from tables import FreqStore
+
+_pdb = None
+
+
+def spawn_rngs(seed, n):
+    """
+    Derive independent random number generators from a master seed.
+
+    Parameters
+    ----------
+    seed : int or None
+        master seed. If None, fresh entropy is used.
+    n : int
+        number of generators.
+
+    Returns
+    -------
+    list
+        `random.Random` generators, one for each simulation.
+
+    """
+    return [rd.Random(int.from_bytes(child.generate_state(4).tobytes(), 'little'))
+            for child in np.random.SeedSequence(seed).spawn(n)]
+
+
+def summarise(mat):
+    """
+    Reduce a simulated match to its outcome and inning scores.
+
+    Parameters
+    ----------
+    mat : Match
+        simulated match.
+
+    Returns
+    -------
+    dict
+        toss, outcome and score of each inning.
+
+    """
+    return {'toss': mat.toss,
+            'outcome': mat.outcome,
+            'scores': [(inn.batting_team, *map(int, inn.score)) for inn in mat]}
+
+
+def run_matches(teams, pdb, n, seed=None, workers=None, func=summarise, chunksize=1):
+    """
+    Simulate a match `n` times across a pool of processes, yielding results as
+    they finish.
+
+    Parameters
+    ----------
+    teams : list
+        names of the two teams.
+    pdb : dict
+        player database.
+    n : int
+        number of simulations.
+    seed : int, optional
+        master seed. The default is None.
+    workers : int, optional
+        number of processes. The default is None, which uses all cores.
+    func : callable, optional
+        picklable function applied to each simulated match in its worker
+        process. The default is `summarise`.
+    chunksize : int, optional
+        number of simulations sent to a worker at a time. The default is 1.
+
+    Yields
+    ------
+    int
+        index of simulation.
+    object
+        result of `func` for that simulation.
+
+    """
+    tasks = list(enumerate(spawn_rngs(seed, n)))
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(pdb,)) as pool:
+        futures = [pool.submit(_run_chunk, teams, tasks[i:i + chunksize], func) for i in range(0, n, chunksize)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def _init_worker(pdb):
+    global _pdb
+    _pdb = pdb
+    FreqStore.get()
+
+
+def _run_chunk(teams, tasks, func):
+    results = []
+    for i, rng in tasks:
+        mat = Match(i, teams, _pdb, rng)
+        mat.run()
+        results.append((i, func(mat)))
+
+    return results
@@ -1,78 +1,188 @@
 import pandas as pd
-from collections import defaultdict
-from functools import reduce
-from itertools import chain
-from operator import add, itemgetter
+from collections import ChainMap, Counter, defaultdict
+from copy import copy
+from operator import itemgetter
 
 from functions import Float, attrlister
 from classes import PlayerMethods
 
 
+class Career:
+    def __init__(self):
+        self.matches = {}
+        self.totals = {k: Counter() for k in ('batting', 'bowling', 'fielding')}
+        self.best = {}
+
+    def add(self, mat_idx, innings):
+        self.remove(mat_idx)
+        self.matches[mat_idx] = figures = self._figures(innings)
+
+        for k, totals in self.totals.items():
+            totals.update(figures[k])
+
+        self._update_best(figures['best'])
+
+    def remove(self, mat_idx):
+        figures = self.matches.pop(mat_idx, None)
+
+        if figures is not None:
+            for k, totals in self.totals.items():
+                totals.subtract(figures[k])
+
+            self.best = {}
+            for figures in self.matches.values():
+                self._update_best(figures['best'])
+
+    def copy(self):
+        new = Career()
+        new.matches = self.matches.copy()
+        new.totals = {k: totals.copy() for k, totals in self.totals.items()}
+        new.best = self.best.copy()
+
+        return new
+
+    def _update_best(self, best):
+        for k, (rank, score) in best.items():
+            if k not in self.best or rank > self.best[k][0]:
+                self.best[k] = rank, score
+
+    @staticmethod
+    def _figures(innings):
+        batting, bowling, fielding = (list(innings[k].values()) for k in ('batting', 'bowling', 'fielding'))
+        wickets, runs, balls = (sum(getattr(inning, attr) for inning in bowling) for attr in ('wickets', 'runs', 'balls'))
+        overs = balls // 6 + (balls % 6 / 10 if balls % 6 else 0)
+
+        figures = {'batting': Counter({'Inn': len(batting),
+                                       'NO': sum(not inning.out for inning in batting),
+                                       'R': sum(inning.runs for inning in batting),
+                                       'B': sum(inning.balls for inning in batting),
+                                       '100s': sum(inning.runs >= 100 for inning in batting),
+                                       '50s': sum(50 <= inning.runs < 100 for inning in batting),
+                                       '4s': sum(inning.fours for inning in batting),
+                                       '6s': sum(inning.sixes for inning in batting)}),
+                   'bowling': Counter({'Inn': len(bowling),
+                                       'B': balls,
+                                       'M': sum(inning.maidens for inning in bowling),
+                                       'R': runs,
+                                       'W': wickets,
+                                       '5WI': sum(inning.wickets >= 5 for inning in bowling),
+                                       '10WM': int(bool(bowling) and wickets >= 10)}),
+                   'fielding': Counter({'Inn': len(fielding),
+                                        **{k: sum(inning[k] for inning in fielding)
+                                           for k in ('catches', 'stumpings', 'run outs')}}),
+                   'best': {}}
+
+        for k, innings in (('HS', batting), ('BBI', bowling)):
+            for inning in innings:
+                rank = inning.balls > 0, inning._score() if inning.balls else ()
+                if k not in figures['best'] or rank > figures['best'][k][0]:
+                    figures['best'][k] = rank, inning.score
+
+        if bowling:
+            rank = balls > 0, (wickets, - runs, overs) if balls else ()
+            figures['best']['BBM'] = rank, '{} - {} ({})'.format(wickets, runs, overs)
+
+        return figures
+
+
+class InningsView(ChainMap):
+    def __init__(self, mat_idx, innings):
+        super().__init__({}, innings)
+        self.mat_idx = mat_idx
+
+    def __getitem__(self, mat_idx):
+        try:
+            return self.maps[0][mat_idx]
+        except KeyError:
+            if mat_idx == self.mat_idx:
+                self.maps[0][mat_idx] = innings = {k: {} for k in ('batting', 'bowling', 'fielding')}
+                return innings
+            elif mat_idx in self.maps[1]:
+                return self.maps[1][mat_idx]
+            raise
+
+
+class RosterView(ChainMap):
+    def __init__(self, mat_idx, players):
+        super().__init__({}, players)
+        self.mat_idx = mat_idx
+
+    def __getitem__(self, name):
+        try:
+            return self.maps[0][name]
+        except KeyError:
+            self.maps[0][name] = player = self.maps[1][name].view(self.mat_idx)
+            return player
+
+
 class Player(PlayerMethods):
     def __init__(self, name, role, styles):
         self.name = name
         self.role = role
         self.batting_style, self.bowling_style = styles
         self.innings = defaultdict(self._init_innings)
+        self.career = Career()
 
     @property
     def batting(self):
-        innings = self._get_innings('batting')
+        career = self._career()
+        totals = career.totals['batting']
+        runs, outs, balls = totals['R'], totals['Inn'] - totals['NO'], totals['B']
 
-        try:
-            runs, outs, balls = self._sum_innings(innings, 'runs', 'out', 'balls')
-            HS = max(innings).score
-        except ValueError:
-            runs = outs = balls = 0
-            HS = ''
-    
         return {'Mat': len(self.innings),
-                'Inn': len(innings),
-                'NO': len(innings) - outs,
+                'Inn': totals['Inn'],
+                'NO': totals['NO'],
                 'R': runs,
                 'B': balls,
-                'HS': HS,
+                'HS': career.best.get('HS', (None, ''))[1],
                 'Avg': round(Float(runs) / outs, 2),
                 'S/R': round(Float(runs) / balls * 100, 2),
-                '100s': sum(1 for inning in innings if inning.runs >= 100),
-                '50s': sum(1 for inning in innings if 50 <= inning.runs < 100),
-                '4s': sum(attrlister(innings, 'fours')),
-                '6s': sum(attrlister(innings, 'sixes'))}
+                '100s': totals['100s'],
+                '50s': totals['50s'],
+                '4s': totals['4s'],
+                '6s': totals['6s']}
 
     @property
     def bowling(self):
-        innings = self._get_innings('bowling')
-        matches = [reduce(add, match.values()) for match in self['bowling'].values()]
-
-        try:
-            wickets, runs, balls = self._sum_innings(innings, 'wickets', 'runs', 'balls')
-            BBI = max(innings).score
-            BBM = max(matches).score
-        except ValueError:
-            wickets = runs = balls = 0
-            BBI = BBM = ''
+        career = self._career()
+        totals = career.totals['bowling']
+        wickets, runs, balls = totals['W'], totals['R'], totals['B']
 
         return {'Mat': len(self.innings),
-                'Inn': len(innings),
+                'Inn': totals['Inn'],
                 'O': balls // 6 + (balls % 6 * 0.1 if balls % 6 else 0),
-                'M': sum(attrlister(innings, 'maidens')),
+                'M': totals['M'],
                 'R': runs,
                 'W': wickets,
-                'BBI': BBI,
-                'BBM': BBM,
+                'BBI': career.best.get('BBI', (None, ''))[1],
+                'BBM': career.best.get('BBM', (None, ''))[1],
                 'Avg': round(Float(runs) / wickets, 2),
                 'Econ': round(Float(runs) / balls * 6, 2),
                 'S/R': round(Float(balls) / wickets, 2),
-                '5WI': sum(1 for inning in innings if inning.wickets >= 5),
-                '10WM': sum(1 for match in matches if match.wickets >= 10)}
+                '5WI': totals['5WI'],
+                '10WM': totals['10WM']}
 
     @property
     def fielding(self):  # change keys
-        innings = self._get_innings('fielding')
+        totals = self._career().totals['fielding']
 
         return {'Mat': len(self.innings),
-                'Inn': len(innings),
-                **{k: sum(v) for k, v in pd.DataFrame(innings, columns=('catches','stumpings','run outs')).items()}}
+                'Inn': totals['Inn'],
+                **{k: totals[k] for k in ('catches', 'stumpings', 'run outs')}}
+
+    def record(self, *mat_idxs):
+        for mat_idx in mat_idxs or list(self.innings):
+            self.career.add(mat_idx, self.innings[mat_idx])
+
+    def forget(self, mat_idx):
+        self.innings.pop(mat_idx, None)
+        self.career.remove(mat_idx)
+
+    def view(self, mat_idx):
+        new = copy(self)
+        new.innings = InningsView(mat_idx, self.innings)
+
+        return new
 
     def init_fielding(self, mat_idx, inn_idx):
         self.innings[mat_idx]['fielding'][inn_idx] = {k: 0 for k in ('catches', 'stumpings', 'run outs')}
@@ -80,11 +190,22 @@ class Player(PlayerMethods):
     def _init_innings(self):
         return {k: {} for k in ('batting', 'bowling', 'fielding')}
 
-    def _get_innings(self, index):
-        return list(chain.from_iterable(inns.values() for inns in self[index].values()))
+    def _career(self):
+        if len(self.innings) == len(self.career.matches):
+            return self.career
+
+        career = self.career.copy()
+        for mat_idx in [mat_idx for mat_idx in career.matches if mat_idx not in self.innings]:
+            career.remove(mat_idx)
+        for mat_idx, innings in self.innings.items():
+            if mat_idx not in career.matches:
+                career.add(mat_idx, innings)
 
-    def _sum_innings(self, innings, *attrs):
-        return map(sum, zip(*attrlister(innings, *attrs)))
+        return career
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('career', Career())
 
     def __getitem__(self, index):
         return {mat_idx: inns[index] for mat_idx, inns in self.innings.items() if inns[index]}
@@ -101,6 +222,29 @@ class Squad:
     def starting(self):
         return self.first_XI
 
+    def view(self, mat_idx):
+        new = copy(self)
+        new.base = self
+        new.players = RosterView(mat_idx, self.players)
+
+        for attr in ('first_XI', 'bowling_order'):
+            if attr in self.__dict__:
+                setattr(new, attr, itemgetter(*attrlister(getattr(self, attr), 'name'))(new))
+
+        return new
+
+    def merge(self):
+        players = self.base.players
+        for name, player in self.players.maps[0].items():
+            if name not in players:
+                players[name] = player
+                player.record()
+            elif player.innings.maps[0]:
+                players[name].innings.update(player.innings.maps[0])
+                players[name].record(*player.innings.maps[0])
+
+        return self.base
+
     @property
     def batting(self):
         return self._get_stats('batting')
@@ -0,0 +1,318 @@
+"""
+This module compiles stored outcome frequencies into dense, normalised
+probability arrays, so that the distribution for a ball can be looked up for
+one or many balls at once with array indexing instead of nested dictionaries.
+The stored frequencies are loaded and compiled once per process and shared
+between matches.
+"""
+
+import os
+import glob
+import shelve
+import numpy as np
+
+from functions import Sampler
+
+outcomes = [*range(7), 'W']
+weights = [[0.7, 0.3], [0.15, 0.5, 0.05, 0.1, 0.05, 0.1, 0.05]]
+bowling_types = ['F', 'S']
+extras_types = ['nb', 'wd', 'lb', 'b']
+
+
+def normalise(vector):
+    """
+    Scale a frequency vector so that it sums to one.
+
+    Parameters
+    ----------
+    vector : array_like or None
+        outcome frequencies.
+
+    Returns
+    -------
+    np.array
+        probabilities, or zeros if there are no observations.
+
+    """
+    vector = np.zeros(len(outcomes)) if np.ndim(vector) != 1 else np.asarray(vector, float)
+    total = vector.sum()
+
+    return vector / total if total else vector
+
+
+def dense(nested):
+    """
+    Convert nested lists of frequency vectors into an array of probabilities.
+
+    Parameters
+    ----------
+    nested : list
+        nested lists of frequency vectors, or None for missing vectors.
+
+    Returns
+    -------
+    np.array
+        probabilities, with outcomes on the last axis.
+
+    """
+    if isinstance(nested, list):
+        return np.array([dense(x) for x in nested])
+
+    return normalise(nested)
+
+
+class FreqTables:
+    def __init__(self, innings, total):
+        """
+        Compile stored frequencies into dense arrays of weighted probabilities,
+        indexed by inning, feature keys and outcome. The inning and total
+        frequencies, and each feature with its own total, are blended in
+        advance with the outcome weights, so that the distribution for a ball
+        is the sum of four lookups. Missing vectors are stored as zeros, so
+        they drop out of the blend, and every looked up axis ends in one such
+        entry that unseen keys fall on.
+
+        Probabilities of extras and run outs are also compiled for each inning
+        and bowler type, along with samplers for dismissals, catches and extra
+        runs.
+
+        Parameters
+        ----------
+        innings : list
+            frequencies for each inning.
+        total : dict
+            frequencies for all innings.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._cache = {}
+
+        sources = [*innings, total]
+        self.styles = {'batting': sorted({style for d in sources for style in d['style'].columns}),
+                       'bowling': sorted({style for d in sources for style in d['style'].index})}
+        self.lookup = {key: {style: code for code, style in enumerate(styles)} for key, styles in self.styles.items()}
+
+        self.batting = self._blend(weights[1][0:2], *self._buckets([[d['batting'].get(pos, {}) for pos in range(11)]
+                                                                    for d in sources]))
+        self.bowling = self._blend(weights[1][2:4], *self._buckets([[d['bowling'].get(k, {}).get('main', {})
+                                                                     for k in bowling_types] for d in sources]))
+        self.overs = self._blend(weights[1][5:7], *self._buckets([[d['overs']] for d in sources]))[:, 0]
+        self.style = self._blend(weights[1][4:5], dense([[[self._style(d, bat, bowl)
+                                                           for bowl in self.styles['bowling']] + [None]
+                                                          for bat in self.styles['batting']]
+                                                         + [[None] * (len(self.styles['bowling']) + 1)]
+                                                         for d in sources]))
+
+        size = 1 + max(runs for d in innings for v in d['extras'].values() for c in v.values()
+                       for runs in c if runs != 'total')
+        self.extras = np.zeros((4, len(bowling_types), len(extras_types)))
+        self.extra_runs = np.zeros((4, len(bowling_types), len(extras_types), size))
+        self.run_outs = np.zeros((4, 2))
+
+        for i, d in enumerate(innings):
+            total = d['overs']['total']
+            for j, k1 in enumerate(bowling_types):
+                for k, k2 in enumerate(extras_types):
+                    extras = d['extras'].get(k1, {}).get(k2, {})
+                    self.extras[i, j, k] = extras.get('total', 0) / (sum(total) if k2 in ('nb', 'wd') else total[0])
+                    for runs, freq in extras.items():
+                        if runs != 'total':
+                            self.extra_runs[i, j, k, runs] = freq
+
+            for value in (0, 1):
+                self.run_outs[i, value] = d['run_outs'].get(value, 1) / total[value]
+
+        self.samplers = [{'dismissals': {k: Sampler.from_dict(v) for k, v in d['dismissals'].items()},
+                          'catches': Sampler.from_dict(d['catches']),
+                          'extras': {k1: {k2: Sampler.from_dict(v2) for k2, v2 in v1.items()}
+                                     for k1, v1 in d['extras'].items()}}
+                         for d in innings]
+
+        self.extra_runs /= np.maximum(1, self.extra_runs.sum(-1, keepdims=True))
+
+    def codes(self, key, styles):
+        """
+        Convert player styles to integer codes for indexing.
+
+        Parameters
+        ----------
+        key : str
+            either 'batting' or 'bowling'.
+        styles : iterable
+            player styles.
+
+        Returns
+        -------
+        np.array
+            style codes, with -1 for unseen styles.
+
+        """
+        return np.array([self.lookup[key].get(style, -1) for style in styles], int)
+
+    def sampler(self, inn, position, batter_bucket, batting_style, bowler_bucket, bowling_style, over_bucket):
+        """
+        Outcome sampler for a single ball, cached for each combination of
+        features.
+
+        Parameters
+        ----------
+        inn : int
+            inning index.
+        position : int
+            true batting position.
+        batter_bucket : int
+            balls faced by the batter, less one, floor divided by 20.
+        batting_style : str
+            batting style.
+        bowler_bucket : int
+            balls bowled by the bowler, less one, floor divided by 30.
+        bowling_style : str
+            bowling style.
+        over_bucket : int
+            balls bowled in the inning, less one, floor divided by 60.
+
+        Returns
+        -------
+        Sampler
+            sampler of `outcomes`.
+
+        """
+        key = (inn, position, batter_bucket, batting_style, bowler_bucket, bowling_style, over_bucket)
+        try:
+            return self._cache[key]
+        except KeyError:
+            p = self.probs(inn, position, batter_bucket, bowling_types.index(bowling_style[-1]), bowler_bucket,
+                           self.lookup['batting'].get(batting_style, -1), self.lookup['bowling'].get(bowling_style, -1),
+                           over_bucket)
+            self._cache[key] = sampler = Sampler(outcomes, p.tolist())
+            return sampler
+
+    def probs(self, inn, position, batter_bucket, bowling_type, bowler_bucket, batting_style, bowling_style,
+              over_bucket):
+        """
+        Blend the feature distributions for one or many balls. All arguments
+        are integers or integer arrays of the same shape.
+
+        Parameters
+        ----------
+        inn : int or np.array
+            inning index.
+        position : int or np.array
+            true batting position, at most 10.
+        batter_bucket : int or np.array
+            balls faced by the batter, less one, floor divided by 20.
+        bowling_type : int or np.array
+            index of bowler type in `bowling_types`.
+        bowler_bucket : int or np.array
+            balls bowled by the bowler, less one, floor divided by 30.
+        batting_style : int or np.array
+            batting style code.
+        bowling_style : int or np.array
+            bowling style code.
+        over_bucket : int or np.array
+            balls bowled in the inning, less one, floor divided by 60.
+
+        Returns
+        -------
+        np.array
+            unnormalised outcome weights, with outcomes on the last axis.
+
+        """
+        return (self.batting[inn, position, self._slot(self.batting, batter_bucket)]
+                + self.bowling[inn, bowling_type, self._slot(self.bowling, bowler_bucket)]
+                + self.style[inn, batting_style, bowling_style]
+                + self.overs[inn, self._slot(self.overs, over_bucket)])
+
+    @staticmethod
+    def _blend(w, table, totals=None):
+        table = w[0] * table if totals is None else w[0] * table + w[1] * totals[..., None, :]
+        return weights[0][0] * table[:4] + weights[0][1] * table[4]
+
+    @staticmethod
+    def _slot(table, bucket):
+        return np.minimum(np.asarray(bucket) + 1, table.shape[-2] - 1)
+
+    @staticmethod
+    def _buckets(counters):
+        size = max([k for row in counters for c in row for k in c if k != 'total'], default=-1) + 2
+        table = dense([[[c.get(k) for k in range(-1, size - 1)] + [None] for c in row] for row in counters])
+        totals = dense([[c.get('total') for c in row] for row in counters])
+
+        return table, totals
+
+    @staticmethod
+    def _style(d, batting_style, bowling_style):
+        try:
+            return d['style'][batting_style][bowling_style]
+        except KeyError:
+            return None
+
+
+class FreqStore:
+    _stores = {}
+
+    def __init__(self, path):
+        """
+        Hold the stored frequencies in memory, along with their compiled
+        tables and toss sampler.
+
+        Parameters
+        ----------
+        path : str
+            path of the shelve file, without extension.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.path = path
+        self.stamp = None
+        self.freqs = self.tables = self.toss = None
+
+    @classmethod
+    def get(cls, path=None):
+        """
+        Get the store for a shelve file, loading it on first use and
+        reloading it if the file has changed since.
+
+        Parameters
+        ----------
+        path : str, optional
+            path of the shelve file, without extension. The default is None,
+            which uses data/real_freqs under the working directory.
+
+        Returns
+        -------
+        FreqStore
+            loaded store.
+
+        """
+        path = os.path.abspath(os.path.join(os.getcwd(), 'data', 'real_freqs') if path is None else path)
+        store = cls._stores.setdefault(path, cls(path))
+        if store.stamp is None or store.stamp != store._stamp():
+            store.load()
+
+        return store
+
+    def load(self):
+        """
+        Read the frequencies from disk and compile them.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.stamp = self._stamp()
+        with shelve.open(self.path, 'r') as fdb:
+            self.freqs = {key: fdb[key] for key in ('innings', 'total', 'toss')}
+
+        self.tables = FreqTables(self.freqs['innings'], self.freqs['total'])
+        self.toss = Sampler.from_dict(self.freqs['toss'])
+
+    def _stamp(self):
+        return sorted((fname, os.path.getmtime(fname)) for fname in glob.glob(glob.escape(self.path) + '*'))